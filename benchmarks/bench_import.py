@@ -0,0 +1,73 @@
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Import-time budget check based on `python -X importtime`. Fails (exit 1) if
+# a module takes longer than its budget to import or drags in a dependency
+# that should only be loaded on first use.
+
+# module: (budget in ms, modules that must not be imported)
+BUDGETS = {
+    "cli": (60, ("PIL", "PyQt5", "numpy", "sqlite3", "concurrent.futures")),
+    "modules.texture_validator": (30, ("PIL", "numpy", "concurrent.futures")),
+    "ui.main_window": (400, ("PIL", "numpy", "sqlite3")),
+}
+
+
+def measure(module):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        return None, set(), proc.stderr.strip().splitlines()[-1]
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        cumulative[name.strip()] = int(cumulative_us)
+    return cumulative.get(module, 0) / 1000.0, set(cumulative), None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time budget check")
+    parser.add_argument("modules", nargs="*", default=list(BUDGETS))
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per module, the fastest is kept")
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules:
+        budget, forbidden = BUDGETS.get(module, (None, ()))
+        best = None
+        for _ in range(args.repeat):
+            elapsed, imported, error = measure(module)
+            if error:
+                break
+            best = elapsed if best is None else min(best, elapsed)
+        if error:
+            # A module that doesn't import fails the check; only the GUI may
+            # be skipped, on machines without Qt
+            if "No module named 'PyQt5'" in error:
+                print(f"{module}: skipped ({error})")
+            else:
+                print(f"{module}: IMPORT FAILED ({error})")
+                failed = True
+            continue
+        status = "ok"
+        if budget is not None and best > budget:
+            status = f"OVER BUDGET ({budget} ms)"
+            failed = True
+        print(f"{module}: {best:.1f} ms {status}")
+        eager = sorted(name for name in imported if name.split(".")[0] in forbidden or name in forbidden)
+        if eager:
+            print(f"  imported eagerly: {', '.join(eager)}")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import generate_tree
+from modules.image_probe import probe_image
+
+# Compares the header-only probe with Pillow's Image.open on a synthetic tree.
+
+
+def time_probe(paths):
+    start = time.perf_counter()
+    for file_path in paths:
+        probe_image(file_path).width
+    return time.perf_counter() - start
+
+
+def time_pillow(paths):
+    from PIL import Image
+    start = time.perf_counter()
+    for file_path in paths:
+        with Image.open(file_path) as img:
+            img.size
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Header probe vs Pillow benchmark")
+    parser.add_argument("--sets", type=int, default=2000)
+    parser.add_argument("--resolution", type=int, default=64)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        paths = generate_tree(root, args.sets, resolution=args.resolution)
+        print(f"{len(paths)} files")
+        probe_time = time_probe(paths)
+        print(f"header probe: {probe_time:.3f}s ({len(paths) / probe_time:.0f} files/s)")
+        try:
+            pillow_time = time_pillow(paths)
+        except ImportError:
+            print("Pillow not installed, skipping comparison")
+            return
+        print(f"Pillow open:  {pillow_time:.3f}s ({len(paths) / pillow_time:.0f} files/s)")
+        print(f"speedup:      {pillow_time / probe_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import DEFAULT_MAPS, WRITERS, generate_tree
+
+# Stage-by-stage benchmark of TextureValidator on synthetic trees.
+#
+#   python benchmarks/run_benchmarks.py --sizes 1000,10000 --save-baseline bench.json
+#   python benchmarks/run_benchmarks.py --sizes 1000,10000 --baseline bench.json
+#
+# Each size runs in its own subprocess so peak RSS is per size. With
+# --baseline the run fails (exit 1) when a stage gets slower, or peak RSS
+# grows, by more than --threshold.
+
+# Slowdowns smaller than this are timer noise, whatever the ratio
+MIN_DELTA_SECONDS = 0.005
+
+# Keeps the Qt application alive for the render stage
+_app = None
+
+
+def run_stages(root, args):
+    from modules.texture_validator import TextureValidator
+    validator = TextureValidator()
+    timings = {}
+
+    def timed(stage, func, repeat=args.repeat):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            value = func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        timings[stage] = best
+        return value
+
+    files = timed("walk", lambda: validator._collect_texture_files(root, args.formats))
+    texture_sets = timed("group", lambda: validator._organize_textures_by_set(files))
+    timed("probe", lambda: [_safe_probe(validator, path) for path in files])
+    results = timed("validate", lambda: validator._validate_texture_sets(
+        texture_sets, args.maps, args.resolution, args.workers))
+
+    render = _render_stage()
+    if render is not None:
+        timed("render", lambda: render(results))
+
+    report = {}
+    for stage, seconds in timings.items():
+        report[stage] = {
+            "seconds": round(seconds, 6),
+            "files_per_sec": round(len(files) / seconds) if seconds else None
+        }
+    return {"files": len(files), "sets": len(texture_sets), "stages": report,
+            "peak_rss_mb": round(_peak_rss_mb(), 1)}
+
+
+def _safe_probe(validator, path):
+    # Broken files are part of the synthetic tree; probe errors are expected
+    try:
+        return validator._read_image_info(path)
+    except Exception:
+        return None
+
+
+def _render_stage():
+    # Filling the GUI results model; skipped when PyQt5 isn't installed
+    try:
+        from PyQt5.QtCore import QCoreApplication
+        from ui.results_model import ResultsModel
+    except ImportError:
+        return None
+    global _app
+    _app = QCoreApplication.instance() or QCoreApplication([])
+
+    def render(results):
+        model = ResultsModel()
+        model.append_results(results)
+        return model.rowCount()
+    return render
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_single(args):
+    tree_dir = args.tree_dir or tempfile.mkdtemp(prefix="tchecker-bench-")
+    root = os.path.join(tree_dir, f"tree_{args.single}")
+    try:
+        if not os.path.isdir(root):
+            set_count = max(1, args.single // len(args.maps))
+            generate_tree(root, set_count, map_types=args.maps, resolutions=args.resolutions, formats=args.formats,
+                          depth=args.depth, error_rate=args.error_rate, pixel_data=False,
+                          sets_per_folder=args.sets_per_folder)
+        print(json.dumps(run_stages(root, args)))
+    finally:
+        if not args.tree_dir:
+            shutil.rmtree(tree_dir, ignore_errors=True)
+
+
+def compare(baseline, current, threshold):
+    regressions = []
+    for size, result in current.items():
+        old = baseline.get(size)
+        if old is None:
+            continue
+        for stage, timing in result["stages"].items():
+            old_timing = old["stages"].get(stage)
+            if (old_timing and timing["seconds"] > old_timing["seconds"] * (1 + threshold)
+                    and timing["seconds"] - old_timing["seconds"] > MIN_DELTA_SECONDS):
+                regressions.append(f"{size} files / {stage}: {old_timing['seconds']:.4f}s -> {timing['seconds']:.4f}s")
+        if result["peak_rss_mb"] > old["peak_rss_mb"] * (1 + threshold):
+            regressions.append(f"{size} files / peak RSS: {old['peak_rss_mb']} MB -> {result['peak_rss_mb']} MB")
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="TextureValidator benchmark suite")
+    parser.add_argument("--sizes", default="1000,10000",
+                        help="Comma-separated file counts, e.g. 1000,10000,100000,1000000")
+    parser.add_argument("--maps", default=",".join(DEFAULT_MAPS),
+                        help="Comma-separated map types each set gets and the validator requires")
+    parser.add_argument("--formats", "--format", default=".tga",
+                        help=f"Comma-separated formats assigned to sets at random ({', '.join(WRITERS)})")
+    parser.add_argument("--resolutions", default="512,1024",
+                        help="Comma-separated resolutions assigned to sets at random")
+    parser.add_argument("--resolution", type=int, default=512, help="Resolution the validator requires")
+    parser.add_argument("--depth", type=int, default=2, help="Folder nesting depth")
+    parser.add_argument("--sets-per-folder", type=int, default=50)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage, the fastest is kept")
+    parser.add_argument("--tree-dir", help="Keep generated trees here and reuse them between runs")
+    parser.add_argument("--baseline", help="Compare against this baseline JSON")
+    parser.add_argument("--save-baseline", help="Write the results to this baseline JSON")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed slowdown before failing, 0.2 = 20%%")
+    parser.add_argument("--single", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    args.resolutions = [int(value) for value in args.resolutions.split(",")]
+    args.maps = [value.strip() for value in args.maps.split(",") if value.strip()]
+    args.formats = [value.strip() for value in args.formats.split(",") if value.strip()]
+    unknown = [value for value in args.formats if value not in WRITERS]
+    if unknown:
+        parser.error(f"unsupported format {', '.join(unknown)}, choose from {', '.join(WRITERS)}")
+    if not args.maps:
+        parser.error("--maps needs at least one map type")
+    return args
+
+
+def main():
+    args = parse_args()
+    if args.single:
+        run_single(args)
+        return 0
+
+    forwarded = sys.argv[1:]
+    current = {}
+    for size in (int(value) for value in args.sizes.split(",")):
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--single", str(size)] + forwarded,
+                              capture_output=True, text=True)
+        if proc.returncode != 0:
+            print(proc.stderr, file=sys.stderr)
+            return 2
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        current[str(size)] = result
+        stages = ", ".join(f"{stage} {timing['seconds']:.3f}s" for stage, timing in result["stages"].items())
+        print(f"{result['files']} files: {stages}, peak RSS {result['peak_rss_mb']} MB")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(current, f, indent=4)
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, current, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+import os
+import random
+import struct
+import zlib
+
+# Helpers for writing synthetic texture trees used by the benchmarks.
+
+DEFAULT_MAPS = ["Albedo", "Normal", "Metallic", "Roughness", "AO"]
+
+# Kinds of broken sets generate_tree can plant
+ERROR_KINDS = ("missing", "size", "corrupt")
+
+
+def write_tga(file_path, width, height, channels=3, pixel_data=True):
+    image_type = 3 if channels == 1 else 2
+    descriptor = 0x20 | (8 if channels == 4 else 0)
+    header = struct.pack("<BBBHHBHHHHBB", 0, 0, image_type, 0, 0, 0, 0, 0,
+                         width, height, channels * 8, descriptor)
+    with open(file_path, "wb") as f:
+        f.write(header)
+        if pixel_data:
+            row = bytes(range(256)) * (width * channels // 256 + 1)
+            row = row[:width * channels]
+            for _ in range(height):
+                f.write(row)
+
+
+def write_png(file_path, width, height, channels=3, pixel_data=True):
+    color_type = {1: 0, 2: 4, 3: 2, 4: 6}[channels]
+
+    def chunk(kind, data):
+        return (struct.pack(">I", len(data)) + kind + data
+                + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF))
+
+    with open(file_path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0)))
+        if pixel_data:
+            row = b"\0" + bytes(range(256)) * (width * channels // 256 + 1)
+            raw = row[:width * channels + 1] * height
+            f.write(chunk(b"IDAT", zlib.compress(raw, 1)))
+            f.write(chunk(b"IEND", b""))
+
+
+WRITERS = {".tga": write_tga, ".png": write_png}
+
+
+def generate_tree(root, set_count, map_types=None, resolution=512, sets_per_folder=50,
+                  pixel_data=True, resolutions=None, formats=(".tga",), depth=1,
+                  error_rate=0.0, seed=0):
+    """Write `set_count` texture sets under `root` and return the file paths.
+
+    Each set gets a resolution from `resolutions` (default: just `resolution`)
+    and a format from `formats`. Folders are nested `depth` levels deep.
+    A fraction `error_rate` of the sets is broken in one of ERROR_KINDS.
+    With pixel_data=False only headers are written, which is enough for the
+    header probe and makes million-file trees cheap to generate.
+    """
+    rng = random.Random(seed)
+    map_types = map_types or DEFAULT_MAPS
+    resolutions = resolutions or [resolution]
+    paths = []
+    for index in range(set_count):
+        folder_index = index // sets_per_folder
+        parts = [f"folder_{folder_index:04d}"]
+        # Spread folders over intermediate levels to reach the requested depth
+        for level in range(1, depth):
+            parts.insert(0, f"level{level}_{folder_index % (level * 3 + 2):02d}")
+        folder = os.path.join(root, *parts)
+        os.makedirs(folder, exist_ok=True)
+
+        set_resolution = rng.choice(resolutions)
+        extension = rng.choice(formats)
+        error = rng.choice(ERROR_KINDS) if rng.random() < error_rate else None
+        broken_map = rng.choice(map_types)
+        for map_type in map_types:
+            if error == "missing" and map_type == broken_map:
+                continue
+            file_path = os.path.join(folder, f"Set{index:07d}_{map_type}{extension}")
+            size = set_resolution * 2 if error == "size" and map_type == broken_map else set_resolution
+            if error == "corrupt" and map_type == broken_map:
+                with open(file_path, "wb") as f:
+                    f.write(b"not an image")
+            else:
+                WRITERS[extension](file_path, size, size, pixel_data=pixel_data)
+            paths.append(file_path)
+    return paths
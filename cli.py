@@ -0,0 +1,388 @@
+import argparse
+import json
+import os
+import sys
+
+from modules.archive_source import is_archive
+from modules.metrics import Profiler, metrics_from_env, profiler_from_env
+from modules.naming_rules import NamingRules
+from modules.texture_validator import TextureValidator
+
+# Headless entry point for CI and pre-commit hooks. Must never import PyQt5.
+
+DEFAULT_MAPS = ["Albedo", "Normal", "Metallic", "Roughness", "AO"]
+
+EXIT_OK = 0
+EXIT_INVALID = 1
+EXIT_ERROR = 2
+# Ctrl-C before the run finished (128 + SIGINT, as shells report it)
+EXIT_INTERRUPTED = 130
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Validate texture sets without the GUI")
+    parser.add_argument("folder", nargs="?",
+                        help="Folder containing textures, or a zip/.unitypackage/tar archive")
+    parser.add_argument("--resolution", type=int, help="Required resolution (default 512)")
+    parser.add_argument("--maps", help="Comma-separated required maps (default: Albedo,Normal,Metallic,Roughness,AO)")
+    parser.add_argument("--format", dest="required_format",
+                        help="Texture file extension(s), comma-separated (default .tga)")
+    parser.add_argument("--rules", help="JSON file of naming rules: map aliases, per-map formats and resolutions")
+    parser.add_argument("--settings", help="Read defaults from a settings.json saved by the GUI")
+    parser.add_argument("--output", choices=["jsonl", "junit"], default="jsonl", help="Report format")
+    parser.add_argument("--output-file", help="Write the report here instead of stdout")
+    parser.add_argument("--workers", type=int, default=1, help="Number of parallel workers")
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread")
+    parser.add_argument("--cache", help="Path of a probe cache database to reuse between runs")
+    parser.add_argument("--content-checks", action="store_true",
+                        help="Also check pixel content (needs NumPy): normals, flipped green, constant maps, ...")
+    parser.add_argument("--content-memory-mb", type=int, default=64,
+                        help="Memory cap per image for content checks")
+    parser.add_argument("--import-settings", action="store_true",
+                        help="Also check Unity .meta import settings: max size, compression, sRGB, mipmaps, read/write")
+    parser.add_argument("--duplicates", action="store_true",
+                        help="Also report byte-identical and near-identical textures (JSON Lines only)")
+    parser.add_argument("--duplicate-index", default=":memory:",
+                        help="SQLite file to keep texture hashes in between runs")
+    parser.add_argument("--vram", action="store_true",
+                        help="Also estimate GPU memory per set, folder and project (needs NumPy, JSON Lines only)")
+    parser.add_argument("--vram-platform", choices=["pc", "mobile"], default="pc",
+                        help="Compression defaults: BC1/BC3/BC4/BC5 (pc) or ASTC (mobile)")
+    parser.add_argument("--vram-formats",
+                        help="Per-map compression overrides, e.g. Albedo=bc7,Normal=bc5,Mask=astc4x4")
+    parser.add_argument("--vram-budget-set", type=float, metavar="MB", help="Fail sets estimated above this")
+    parser.add_argument("--vram-budget-folder", type=float, metavar="MB", help="Fail folders estimated above this")
+    parser.add_argument("--vram-budget-project", type=float, metavar="MB", help="Fail if the whole run is above this")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and report sets again when their files change (JSON Lines only)")
+    parser.add_argument("--changed-since", metavar="REF",
+                        help="Only check texture sets with files changed since this git ref")
+    parser.add_argument("--staged", action="store_true",
+                        help="Only check texture sets with files in the staged git index (pre-commit)")
+    parser.add_argument("--store", help="SQLite result store: record this run, or read from it with the options below")
+    parser.add_argument("--runs", action="store_true", help="List the runs in --store instead of validating")
+    parser.add_argument("--show-run", metavar="RUN",
+                        help="Print a stored run (an id, latest or previous) instead of validating")
+    parser.add_argument("--where-map", help="With --show-run: only issues of this map type")
+    parser.add_argument("--where-kind", help="With --show-run: only issues of this kind (size, format, ...)")
+    parser.add_argument("--where-folder", help="With --show-run: only issues in this folder or below it")
+    parser.add_argument("--diff", nargs=2, metavar=("OLD", "NEW"),
+                        help="List sets newly broken, fixed, added or removed between two stored runs")
+    parser.add_argument("--metrics-json", help="Write stage timings, counters and probe latencies here as JSON")
+    parser.add_argument("--metrics-prom", help="Write the same metrics as a Prometheus textfile")
+    parser.add_argument("--profile", choices=["cprofile", "pyinstrument"],
+                        help="Profile the run (also set by TCHECKER_PROFILE)")
+    parser.add_argument("--profile-out", help="Where to write the profile")
+    return parser.parse_args(argv)
+
+
+def resolve_settings(args):
+    settings = {}
+    if args.settings:
+        with open(args.settings, "r") as f:
+            settings = json.load(f)
+    maps = args.maps.split(",") if args.maps else settings.get("required_maps", DEFAULT_MAPS)
+    naming_rules = settings.get("naming_rules", {})
+    if args.rules:
+        with open(args.rules, "r") as f:
+            naming_rules = json.load(f)
+    return {
+        "required_resolution": args.resolution or settings.get("required_resolution", 512),
+        "required_format": args.required_format or settings.get("required_format", ".tga"),
+        "required_maps": [map_name.strip() for map_name in maps if map_name.strip()],
+        "naming_rules": naming_rules
+    }
+
+
+def write_jsonl(results, out):
+    # Returns (sets, invalid sets); the summary comes last, from write_summary
+    total = invalid = 0
+    for result in results:
+        total += 1
+        if result["status"] != "valid":
+            invalid += 1
+        out.write(json.dumps({"type": "result", **result}) + "\n")
+        out.flush()
+    return total, invalid
+
+
+def write_summary(out, sets, invalid, vram_budget=None):
+    summary = {"type": "summary", "sets": sets, "invalid": invalid}
+    if vram_budget is not None:
+        summary["vram_budget"] = vram_budget
+    out.write(json.dumps(summary) + "\n")
+
+
+def write_junit(results, out):
+    import xml.etree.ElementTree as ET
+    suite = ET.Element("testsuite", name="texture-check")
+    invalid = 0
+    for result in results:
+        case = ET.SubElement(suite, "testcase", classname="textures", name=result["texture_set"])
+        if result["status"] != "valid":
+            invalid += 1
+            failure = ET.SubElement(case, "failure", message=result["message"])
+            failure.text = "\n".join(issue["message"] for issue in result.get("issues", []))
+    suite.set("tests", str(len(suite)))
+    suite.set("failures", str(invalid))
+    out.write(ET.tostring(suite, encoding="unicode"))
+    out.write("\n")
+    return invalid
+
+
+def write_duplicates(validator, args, settings, out):
+    from modules.duplicate_index import DuplicateIndex
+    texture_files = validator._collect_texture_files(args.folder, settings["required_format"])
+    index = DuplicateIndex(args.duplicate_index)
+    try:
+        index.scan(texture_files, workers=args.workers)
+        clusters = index.find_clusters(texture_files)
+    finally:
+        index.close()
+    for match in ("exact", "similar"):
+        for paths in clusters[match]:
+            out.write(json.dumps({"type": "duplicates", "match": match, "paths": paths}) + "\n")
+
+
+def parse_vram_formats(text):
+    formats = {}
+    for item in (text or "").split(","):
+        if item.strip():
+            map_type, _, name = item.partition("=")
+            formats[map_type.strip()] = name.strip()
+    return formats
+
+
+def record_vram(results, table):
+    for result in results:
+        table.add_result(result)
+        yield result
+
+
+def write_vram(table, args, out):
+    # Per-set, per-folder and project estimates, then whatever is over budget
+    totals = table.rollup()
+    for index, folder, name in table.live_sets():
+        out.write(json.dumps({"type": "vram", "scope": "set", "folder": folder, "texture_set": name,
+                              "bytes": int(totals["sets"][index])}) + "\n")
+    for index, folder in enumerate(table.folders):
+        out.write(json.dumps({"type": "vram", "scope": "folder", "folder": folder,
+                              "bytes": int(totals["folders"][index])}) + "\n")
+    out.write(json.dumps({"type": "vram", "scope": "project", "bytes": totals["project"],
+                          "by_map": table.by_map_type()}) + "\n")
+    megabyte = 1024 * 1024
+    exceeded = table.over_budget(
+        *(None if budget is None else int(budget * megabyte)
+          for budget in (args.vram_budget_set, args.vram_budget_folder, args.vram_budget_project))
+    )
+    for entry in exceeded:
+        out.write(json.dumps({"type": "vram_budget", **entry}) + "\n")
+    return len(exceeded)
+
+
+def record_run(results, store, run_id):
+    for result in results:
+        store.add_result(run_id, result)
+        yield result
+
+
+def query_store(args, out):
+    # --runs, --show-run and --diff read the store without validating anything
+    from modules.result_store import ResultStore
+    store = ResultStore(args.store)
+    try:
+        if args.runs:
+            for run in store.runs():
+                out.write(json.dumps({"type": "run", **run}) + "\n")
+            return EXIT_OK
+        if args.diff:
+            old_run, new_run = (store.resolve_run(run) for run in args.diff)
+            changes = store.diff(old_run, new_run)
+            for change in ("broken", "fixed", "added", "removed"):
+                for folder, name in changes[change]:
+                    out.write(json.dumps({"type": "diff", "change": change, "folder": folder,
+                                          "texture_set": name}) + "\n")
+            # Sets a partial run didn't re-check are left out of the comparison
+            partial = store.is_partial(old_run) or store.is_partial(new_run)
+            out.write(json.dumps({"type": "summary", "old_run": old_run, "new_run": new_run,
+                                  **{change: len(sets) for change, sets in changes.items()},
+                                  "partial": partial}) + "\n")
+            return EXIT_INVALID if changes["broken"] else EXIT_OK
+        run_id = store.resolve_run(args.show_run)
+        if args.where_map or args.where_kind or args.where_folder:
+            issues = store.query_issues(run_id, args.where_map, args.where_kind, args.where_folder, recursive=True)
+            for issue in issues:
+                out.write(json.dumps({"type": "issue", **issue}) + "\n")
+            out.write(json.dumps({"type": "summary", "run": run_id, "issues": len(issues)}) + "\n")
+            return EXIT_INVALID if issues else EXIT_OK
+        sets, invalid = write_jsonl(store.iter_results(run_id), out)
+        write_summary(out, sets, invalid)
+        return EXIT_INVALID if invalid else EXIT_OK
+    finally:
+        store.close()
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.runs or args.show_run or args.diff:
+        if not args.store:
+            print("Error: --runs, --show-run and --diff need --store", file=sys.stderr)
+            return EXIT_ERROR
+        out = open(args.output_file, "w") if args.output_file else sys.stdout
+        try:
+            return query_store(args, out)
+        except KeyError as e:
+            print(f"Error: {e.args[0]}", file=sys.stderr)
+            return EXIT_ERROR
+        finally:
+            if out is not sys.stdout:
+                out.close()
+    if not args.folder:
+        print("Error: a folder or archive is required", file=sys.stderr)
+        return EXIT_ERROR
+    archive = is_archive(args.folder)
+    if not os.path.isdir(args.folder) and not archive:
+        print(f"Error: {args.folder} is not a folder or a supported archive", file=sys.stderr)
+        return EXIT_ERROR
+    if archive and (args.watch or args.duplicates or args.changed_since or args.staged):
+        print("Error: archives can't be combined with --watch, --duplicates, --changed-since or --staged",
+              file=sys.stderr)
+        return EXIT_ERROR
+    if args.watch and args.output != "jsonl":
+        print("Error: --watch only supports JSON Lines output", file=sys.stderr)
+        return EXIT_ERROR
+    if args.duplicates and (args.output != "jsonl" or args.watch):
+        print("Error: --duplicates only supports JSON Lines output without --watch", file=sys.stderr)
+        return EXIT_ERROR
+    if args.vram and (args.output != "jsonl" or args.watch):
+        print("Error: --vram only supports JSON Lines output without --watch", file=sys.stderr)
+        return EXIT_ERROR
+    incremental = bool(args.changed_since or args.staged)
+    if incremental and args.watch:
+        print("Error: --changed-since/--staged can't be combined with --watch", file=sys.stderr)
+        return EXIT_ERROR
+    try:
+        settings = resolve_settings(args)
+        naming_rules = NamingRules.from_dict(settings["naming_rules"])
+    except (OSError, ValueError) as e:
+        print(f"Error reading settings: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    target = args.folder
+    if incremental:
+        from modules.git_changes import changed_paths
+        try:
+            target = changed_paths(args.folder, args.changed_since, args.staged)
+        except RuntimeError as e:
+            print(f"Error reading git changes: {e}", file=sys.stderr)
+            return EXIT_ERROR
+
+    probe_cache = None
+    if args.cache:
+        from modules.probe_cache import ProbeCache
+        probe_cache = ProbeCache(args.cache)
+    content_checker = None
+    if args.content_checks:
+        try:
+            from modules.content_checks import ContentChecker
+            content_checker = ContentChecker(args.content_memory_mb)
+        except ImportError:
+            print("Error: --content-checks needs NumPy (pip install numpy)", file=sys.stderr)
+            return EXIT_ERROR
+    vram_table = None
+    if args.vram:
+        try:
+            from modules.vram_budget import VramTable
+            vram_table = VramTable(args.vram_platform, parse_vram_formats(args.vram_formats))
+        except ImportError:
+            print("Error: --vram needs NumPy (pip install numpy)", file=sys.stderr)
+            return EXIT_ERROR
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return EXIT_ERROR
+    folder_name = os.path.basename(os.path.abspath(args.folder))
+    metrics = metrics_from_env(folder_name, enabled=bool(args.metrics_json or args.metrics_prom))
+    profiler = Profiler(args.profile, args.profile_out) if args.profile else profiler_from_env()
+    import_checker = None
+    if args.import_settings:
+        from modules.unity_meta import ImportSettingsChecker
+        import_checker = ImportSettingsChecker()
+    validator = TextureValidator(probe_cache, content_checker, metrics, naming_rules, import_checker)
+    validator.record_textures = vram_table is not None
+    if archive:
+        # Read sequentially in one pass; --workers doesn't apply
+        results = validator.iter_validate_archive(
+            args.folder,
+            settings["required_maps"],
+            settings["required_resolution"],
+            settings["required_format"]
+        )
+    else:
+        if incremental:
+            validate = validator.iter_validate_paths
+        else:
+            validate = validator.watch if args.watch else validator.iter_validate
+        results = validate(
+            target,
+            settings["required_maps"],
+            settings["required_resolution"],
+            settings["required_format"],
+            workers=args.workers,
+            executor=args.executor
+        )
+    if vram_table is not None:
+        results = record_vram(results, vram_table)
+    result_store = run_id = None
+    if args.store:
+        from modules.result_store import ResultStore
+        result_store = ResultStore(args.store)
+        run_id = result_store.begin_run(os.path.abspath(args.folder), {
+            "required_maps": settings["required_maps"],
+            "required_resolution": settings["required_resolution"],
+            "required_format": settings["required_format"],
+            "changed_since": args.changed_since,
+            "staged": args.staged
+        })
+        results = record_run(results, result_store, run_id)
+
+    out = open(args.output_file, "w") if args.output_file else sys.stdout
+    if profiler is not None:
+        profiler.start()
+    complete = False
+    try:
+        if args.output == "junit":
+            invalid = write_junit(results, out)
+        else:
+            sets, invalid = write_jsonl(results, out)
+        complete = True
+        if args.duplicates:
+            write_duplicates(validator, args, settings, out)
+        budget_failures = None
+        if vram_table is not None:
+            budget_failures = write_vram(vram_table, args, out)
+        if args.output != "junit":
+            write_summary(out, sets, invalid, budget_failures)
+        invalid += budget_failures or 0
+    except KeyboardInterrupt:
+        # Normal way to leave --watch; anywhere else the report is cut short
+        complete = args.watch
+        if args.watch:
+            return EXIT_OK
+        print("Interrupted, the report is incomplete", file=sys.stderr)
+        return EXIT_INTERRUPTED
+    finally:
+        if result_store is not None:
+            # Runs cut short by an error are kept, marked incomplete
+            result_store.end_run(run_id, complete)
+            result_store.close()
+        if profiler is not None:
+            profiler.stop()
+        if out is not sys.stdout:
+            out.close()
+        if probe_cache is not None:
+            probe_cache.close()
+        metrics.export(args.metrics_json, args.metrics_prom)
+    return EXIT_INVALID if invalid else EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
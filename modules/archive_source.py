@@ -0,0 +1,140 @@
+import io
+import os
+
+from modules.image_probe import info_from_pillow, probe_bytes, read_header
+
+# Reads texture headers straight out of zip, .unitypackage and tar archives
+# in one sequential pass, without extracting anything. Only the header of
+# each member is read (a little more for formats Pillow has to identify);
+# gzip-compressed tars are read as a stream, so memory stays flat whatever
+# the archive size. zipfile and tarfile are imported on first use.
+
+ARCHIVE_EXTENSIONS = (".zip", ".unitypackage", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")
+
+# How much of an unrecognised member Pillow gets to identify it from
+FALLBACK_READ_LIMIT = 64 * 1024
+
+
+def is_archive(path):
+    return path.lower().endswith(ARCHIVE_EXTENSIONS) and os.path.isfile(path)
+
+
+def iter_archive(archive_path, wanted):
+    """Yield (member_path, info) for members whose file name passes `wanted`.
+
+    member_path uses "/" separators; for a .unitypackage it is the asset's
+    original project path. info is an ImageInfo, or the exception raised
+    while probing that member.
+    """
+    lowered = archive_path.lower()
+    if lowered.endswith(".zip"):
+        return _iter_zip(archive_path, wanted)
+    if lowered.endswith(".unitypackage"):
+        return _iter_unitypackage(archive_path, wanted)
+    return _iter_tar(archive_path, wanted)
+
+
+def _iter_zip(archive_path, wanted):
+    import zipfile
+    with zipfile.ZipFile(archive_path) as archive:
+        members = [info for info in archive.infolist()
+                   if not info.is_dir() and wanted(os.path.basename(info.filename))]
+        # Local header order, so the archive is read front to back
+        members.sort(key=lambda info: info.header_offset)
+        for info in members:
+            try:
+                with archive.open(info) as f:
+                    prefix = _read_prefix(f, _extension(info.filename))
+            except Exception as e:
+                yield info.filename, e
+                continue
+            yield info.filename, _probe_prefix(prefix, info.filename)
+
+
+def _iter_tar(archive_path, wanted):
+    import tarfile
+    # "r|*" streams: members are visited once, in order, never seeked back to
+    with tarfile.open(archive_path, "r|*") as archive:
+        for member in archive:
+            if member.isfile() and wanted(os.path.basename(member.name)):
+                try:
+                    prefix = _read_prefix(archive.extractfile(member), _extension(member.name))
+                except Exception as e:
+                    yield member.name, e
+                    continue
+                yield member.name, _probe_prefix(prefix, member.name)
+
+
+def _iter_unitypackage(archive_path, wanted):
+    # A .unitypackage is a tar.gz with one folder per asset GUID holding
+    # "asset" (the file), "pathname" (its project path) and "asset.meta".
+    # Either of asset and pathname can come first, so the header of an asset
+    # whose path isn't known yet is kept until it is; entries of one GUID
+    # are adjacent, so only a few are ever pending.
+    import tarfile
+    pending = {}
+    with tarfile.open(archive_path, "r|gz") as archive:
+        for member in archive:
+            if not member.isfile():
+                continue
+            guid, _, leaf = member.name.lstrip("./").partition("/")
+            if leaf not in ("asset", "pathname"):
+                continue
+            entry = pending.setdefault(guid, {})
+            f = archive.extractfile(member)
+            if leaf == "pathname":
+                lines = f.read(4096).decode("utf-8", errors="replace").splitlines()
+                entry["path"] = lines[0].strip() if lines else ""
+                if not wanted(os.path.basename(entry["path"])):
+                    # Not a texture: forget its data, or skip it when it comes
+                    if "prefix" in entry:
+                        del pending[guid]
+                    else:
+                        entry.clear()
+                        entry["skip"] = True
+                    continue
+            elif entry.get("skip"):
+                del pending[guid]
+                continue
+            else:
+                try:
+                    entry["prefix"] = _read_prefix(f, _extension(entry.get("path", "")))
+                except Exception as e:
+                    entry["prefix"] = e
+            if "path" in entry and "prefix" in entry:
+                del pending[guid]
+                if isinstance(entry["prefix"], Exception):
+                    yield entry["path"], entry["prefix"]
+                else:
+                    yield entry["path"], _probe_prefix(entry["prefix"], entry["path"])
+    for entry in pending.values():
+        if "path" in entry:
+            yield entry["path"], FileNotFoundError("Asset data missing from package")
+
+
+def _extension(name):
+    return os.path.splitext(name)[1]
+
+
+def _read_prefix(f, extension):
+    header = read_header(f)
+    if probe_bytes(header, extension) is None:
+        # Unknown to the header parser (or TGA before its name is known):
+        # keep enough for Pillow to identify it
+        header += f.read(FALLBACK_READ_LIMIT - len(header))
+    return header
+
+
+def _probe_prefix(prefix, name):
+    info = probe_bytes(prefix, _extension(name))
+    if info is not None:
+        return info._replace(bytes_read=len(prefix))
+    try:
+        from PIL import Image, UnidentifiedImageError
+        with Image.open(io.BytesIO(prefix)) as img:
+            return info_from_pillow(img, len(prefix))
+    except UnidentifiedImageError:
+        # Pillow would name the BytesIO object instead of the member
+        return ValueError(f"cannot identify image file '{name}'")
+    except Exception as e:
+        return e
@@ -1,31 +1,97 @@
 import json
 import os
+import tempfile
+import threading
 
 class ConfigManager:
-    def __init__(self, config_path):
+    def __init__(self, config_path, write_delay=None):
         self.config_path = config_path
+        # With a write_delay (seconds) updates are coalesced and written once
+        # things have been quiet that long; call flush() before exiting.
+        # None writes every update straight away.
+        self.write_delay = write_delay
         self.settings = {}
+        self._lock = threading.RLock()
+        # Held for a whole write, so snapshots reach the file in order
+        self._write_lock = threading.Lock()
+        self._timer = None
+        self._dirty = False
+        self._loaded = False
         self.load_settings()
-    
-    def load_settings(self):
-        if os.path.exists(self.config_path):
-            try:
-                with open(self.config_path, 'r') as f:
-                    self.settings = json.load(f)
-            except:
+
+    def load_settings(self, reload=False):
+        # The file is only parsed once, later calls return the in-memory copy
+        with self._lock:
+            if self._loaded and not reload:
+                return self.settings
+            if os.path.exists(self.config_path):
+                try:
+                    with open(self.config_path, 'r') as f:
+                        self.settings = json.load(f)
+                except:
+                    self.settings = {}
+            else:
                 self.settings = {}
-        else:
-            self.settings = {}
-    
+            self._loaded = True
+            return self.settings
+
+    def get_setting(self, key, default=None):
+        with self._lock:
+            return self.settings.get(key, default)
+
     def save_settings(self):
-        os.makedirs(os.path.dirname(self.config_path), exist_ok=True)
-        with open(self.config_path, 'w') as f:
-            json.dump(self.settings, f, indent=4)
-    
+        with self._write_lock:
+            self._write()
+
+    def flush(self):
+        # Also waits for a write the timer has already started
+        with self._write_lock:
+            with self._lock:
+                self._cancel_timer()
+                dirty = self._dirty
+            if dirty:
+                self._write()
+
+    def _write(self):
+        # Caller holds _write_lock
+        with self._lock:
+            self._cancel_timer()
+            data = json.dumps(self.settings, indent=4)
+            self._dirty = False
+        directory = os.path.dirname(self.config_path) or "."
+        os.makedirs(directory, exist_ok=True)
+        # Write to a temp file and rename so a crash never leaves half a file
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".settings-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(data)
+            os.replace(temp_path, self.config_path)
+        except:
+            os.unlink(temp_path)
+            raise
+
     def update_setting(self, key, value):
-        self.settings[key] = value
-        self.save_settings()
-    
+        with self._lock:
+            self.settings[key] = value
+        self._schedule_save()
+
     def update_settings(self, settings_dict):
-        self.settings.update(settings_dict)
-        self.save_settings()
\ No newline at end of file
+        with self._lock:
+            self.settings.update(settings_dict)
+        self._schedule_save()
+
+    def _schedule_save(self):
+        if self.write_delay is None:
+            self.save_settings()
+            return
+        with self._lock:
+            self._dirty = True
+            self._cancel_timer()
+            self._timer = threading.Timer(self.write_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
@@ -0,0 +1,216 @@
+import os
+
+from modules.image_probe import HEADER_SIZE, tga_layout
+from modules.naming_rules import NORMAL_MAPS, SINGLE_CHANNEL_MAPS
+
+# Optional pixel-content checks. Images are decoded in horizontal strips
+# (uncompressed TGA is memory-mapped and read strip by strip; other formats
+# go through Pillow) and every statistic is a vectorised NumPy pass over a
+# strip, so peak memory stays under max_memory_mb whatever the resolution.
+
+# Bytes of working memory per pixel: the uint8 strip plus float32 temporaries
+WORKING_BYTES_PER_PIXEL = 48
+
+# Bytes per pixel Pillow keeps in memory for a mode: everything wider than
+# one byte is stored in 32-bit pixels (RGB included)
+_PILLOW_PIXEL_BYTES = {"1": 1, "L": 1, "P": 1}
+
+
+class ContentCheckSkipped(Exception):
+    """Raised for maps that can't be checked: too large for the memory budget,
+    or in a format Pillow can't decode (EXR)."""
+
+# Normal maps: mean |length - 1| allowed, and how much more curl the stored
+# green channel must produce than the flipped one before we call it flipped
+NORMAL_LENGTH_TOLERANCE = 0.1
+GREEN_FLIP_RATIO = 1.5
+MIN_CURL_ENERGY = 1e-4
+
+
+class ContentChecker:
+    def __init__(self, max_memory_mb=64, normal_tolerance=NORMAL_LENGTH_TOLERANCE):
+        import numpy
+        self.np = numpy
+        self.max_memory = max_memory_mb * 1024 * 1024
+        self.normal_tolerance = normal_tolerance
+
+    def __getstate__(self):
+        # Modules don't pickle; process-pool workers import NumPy themselves
+        state = dict(self.__dict__)
+        del state["np"]
+        return state
+
+    def __setstate__(self, state):
+        import numpy
+        self.__dict__.update(state)
+        self.np = numpy
+
+    def check(self, map_type, file_path):
+        """Return a list of problem descriptions for one map."""
+        kind = map_type.lower()
+        stats = _Stats(self.np, normal=kind in NORMAL_MAPS)
+        strips = self._iter_strips(file_path)
+        if strips is None:
+            raise ContentCheckSkipped(
+                f"Content checks skipped, too large to decode within {self.max_memory // (1024 * 1024)} MB"
+            )
+        for strip in strips:
+            stats.add(strip)
+        return stats.problems(kind, self.normal_tolerance)
+
+    def _rows_per_strip(self, width):
+        return max(2, self.max_memory // (width * WORKING_BYTES_PER_PIXEL))
+
+    def _iter_strips(self, file_path):
+        # Yields uint8 arrays of shape (rows, width, channels), top row first,
+        # channels in RGB(A) order
+        if os.path.splitext(file_path)[1].lower() == ".tga":
+            with open(file_path, "rb") as f:
+                header = f.read(HEADER_SIZE)
+            try:
+                image_type, width, height, depth, offset, top_down = tga_layout(header)
+            except Exception:
+                image_type = None
+            if image_type in (2, 3) and depth in (8, 24, 32):
+                return self._iter_tga_strips(file_path, width, height, depth // 8, offset, top_down)
+        return self._iter_pillow_strips(file_path)
+
+    def _iter_tga_strips(self, file_path, width, height, channels, offset, top_down):
+        np = self.np
+        pixels = np.memmap(file_path, dtype=np.uint8, mode="r", offset=offset,
+                           shape=(height, width, channels))
+        # TGA stores BGR(A)
+        order = [2, 1, 0, 3][:channels] if channels >= 3 else list(range(channels))
+        step = self._rows_per_strip(width)
+        try:
+            for top in range(0, height, step):
+                bottom = min(top + step, height)
+                if top_down:
+                    strip = pixels[top:bottom]
+                else:
+                    strip = pixels[height - bottom:height - top][::-1]
+                yield np.ascontiguousarray(strip[..., order])
+        finally:
+            del pixels
+
+    def _iter_pillow_strips(self, file_path):
+        from PIL import Image, UnidentifiedImageError
+        try:
+            img = Image.open(file_path)
+        except UnidentifiedImageError:
+            # The header probe knows more formats than Pillow decodes; a file
+            # in a format Pillow does know is broken, and that is an issue
+            extension = os.path.splitext(file_path)[1].lower()
+            if extension in Image.registered_extensions():
+                raise
+            raise ContentCheckSkipped(f"Content checks skipped, can't decode {extension.lstrip('.').upper()}")
+        width, height = img.size
+        mode = img.mode
+        if mode not in ("L", "LA", "RGB", "RGBA"):
+            mode = "RGBA" if "A" in img.getbands() else "RGB"
+        channels = len(mode)
+        # Pillow can't decode part of an image. Peak use is Pillow's decode
+        # (plus the converted copy, if any) and then the converted image
+        # next to its bytes; after that only the bytes and the strips remain
+        pixels = width * height
+        decoded = pixels * _PILLOW_PIXEL_BYTES.get(img.mode, 4)
+        converted = pixels * _PILLOW_PIXEL_BYTES.get(mode, 4)
+        array_bytes = pixels * channels
+        peak = max(decoded + (converted if mode != img.mode else 0), converted + array_bytes)
+        step = (self.max_memory - array_bytes) // (width * WORKING_BYTES_PER_PIXEL)
+        if peak > self.max_memory or step < 2:
+            img.close()
+            return None
+        return self._slice_pillow_image(img, mode, step)
+
+    def _slice_pillow_image(self, img, mode, step):
+        np = self.np
+        try:
+            if img.mode != mode:
+                converted = img.convert(mode)
+                # Drop the original decode before copying out the bytes
+                img.close()
+                img = converted
+            width, height = img.size
+            data = img.tobytes()
+        finally:
+            img.close()
+        pixels = np.frombuffer(data, dtype=np.uint8).reshape(height, width, len(mode))
+        for top in range(0, height, step):
+            yield pixels[top:top + step]
+
+
+class _Stats:
+    # Running statistics over strips; nothing here loops over pixels
+
+    def __init__(self, np, normal=False):
+        self.np = np
+        self.normal = normal
+        self.channels = None
+        self.minimum = None
+        self.maximum = None
+        self.rgb_differs = False
+        self.pixels = 0
+        self.length_error = 0.0
+        self.curl_stored = 0.0
+        self.curl_flipped = 0.0
+        self.prev_row = None
+
+    def add(self, strip):
+        np = self.np
+        channels = strip.shape[2]
+        low = strip.min(axis=(0, 1))
+        high = strip.max(axis=(0, 1))
+        if self.minimum is None:
+            self.channels = channels
+            self.minimum, self.maximum = low, high
+        else:
+            self.minimum = np.minimum(self.minimum, low)
+            self.maximum = np.maximum(self.maximum, high)
+        self.pixels += strip.shape[0] * strip.shape[1]
+        if channels >= 3 and not self.rgb_differs:
+            self.rgb_differs = bool((strip[..., 0] != strip[..., 1]).any()
+                                    or (strip[..., 1] != strip[..., 2]).any())
+        if self.normal and channels >= 3:
+            self._add_normals(strip)
+
+    def _add_normals(self, strip):
+        np = self.np
+        n = strip[..., :3].astype(np.float32) * (2.0 / 255.0) - 1.0
+        length = np.sqrt((n * n).sum(axis=2))
+        self.length_error += float(np.abs(length - 1.0).sum())
+
+        # A height-derived normal field is curl free: with P = -x and Q = y in
+        # image space (rows going down), dQ/dx - dP/drow ~ 0 for the OpenGL
+        # (Y+) convention Unity expects. A flipped green channel makes the
+        # curl of the stored field large and that of the flipped field small.
+        xy = n[..., :2]
+        if self.prev_row is not None:
+            xy = np.concatenate([self.prev_row, xy])
+        self.prev_row = xy[-1:].copy()
+        if xy.shape[0] < 2 or xy.shape[1] < 2:
+            return
+        d_green = xy[:-1, 1:, 1] - xy[:-1, :-1, 1]
+        d_red = -(xy[1:, :-1, 0] - xy[:-1, :-1, 0])
+        self.curl_stored += float(np.square(d_green - d_red).sum())
+        self.curl_flipped += float(np.square(-d_green - d_red).sum())
+
+    def problems(self, kind, normal_tolerance):
+        if self.minimum is None:
+            return []
+        problems = []
+        if (self.minimum == self.maximum).all():
+            values = ", ".join(str(int(v)) for v in self.minimum)
+            problems.append(f"Constant color ({values})")
+        if self.channels in (2, 4) and self.minimum[-1] == 255:
+            problems.append("Alpha channel is fully opaque")
+        if kind in SINGLE_CHANNEL_MAPS and self.channels >= 3 and not self.rgb_differs:
+            problems.append("Stored as RGB but all channels are equal, use a single channel")
+        if self.normal and self.channels >= 3:
+            mean_error = self.length_error / self.pixels
+            if mean_error > normal_tolerance:
+                problems.append(f"Normals are not unit length (mean error {mean_error:.2f})")
+            if (self.curl_stored > GREEN_FLIP_RATIO * self.curl_flipped
+                    and self.curl_stored / self.pixels > MIN_CURL_ENERGY):
+                problems.append("Green channel looks flipped (DirectX convention, expected OpenGL)")
+        return problems
@@ -0,0 +1,221 @@
+import hashlib
+import mmap
+import os
+import sqlite3
+import threading
+import time
+
+# Finds byte-identical and visually near-identical textures across a tree.
+# Each file gets a content hash (xxhash if installed, else BLAKE2 over the
+# memory-mapped bytes), a 64-bit difference hash of an 9x8 grayscale
+# thumbnail and its mean color. The difference hash only encodes gradients,
+# so every flat map hashes to 0; the mean color keeps a black Metallic and a
+# white AO map apart. All of it is kept in SQLite keyed by
+# (path, size, mtime_ns), so a rescan only hashes files that changed.
+# Clustering buckets the hashes instead of comparing every pair.
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+HASH_CHUNK = 16 * 1024 * 1024
+
+# Largest per-channel difference of mean color (0-255) still called similar
+COLOR_TOLERANCE = 16
+
+
+def content_hash(file_path):
+    hasher = xxhash.xxh3_128() if xxhash is not None else hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return hasher.hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            for start in range(0, len(data), HASH_CHUNK):
+                hasher.update(data[start:start + HASH_CHUNK])
+    return hasher.hexdigest()
+
+
+def perceptual_hash(file_path):
+    """Return (dHash, mean color packed as 0xRRGGBB) of an image."""
+    # dHash: one bit per horizontally adjacent pixel pair of a 9x8 thumbnail
+    from PIL import Image
+    with Image.open(file_path) as img:
+        img.draft("RGB", (64, 64))
+        rgb = img.convert("RGB")
+        small = rgb.convert("L").resize((9, 8), Image.BILINEAR, reducing_gap=2.0)
+        pixels = small.tobytes()
+        red, green, blue = rgb.resize((1, 1), Image.BOX, reducing_gap=2.0).getpixel((0, 0))
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            value = (value << 1) | (left > right)
+    # SQLite integers are signed
+    value = value - (1 << 64) if value >= (1 << 63) else value
+    return value, (red << 16) | (green << 8) | blue
+
+
+def color_distance(a, b):
+    return max(abs(((a >> shift) & 0xFF) - ((b >> shift) & 0xFF)) for shift in (16, 8, 0))
+
+
+def hamming(a, b):
+    return bin((a ^ b) & 0xFFFFFFFFFFFFFFFF).count("1")
+
+
+class DuplicateIndex:
+    def __init__(self, index_path, max_distance=4):
+        self.index_path = index_path
+        # Perceptual hashes at most this many bits apart count as similar
+        self.max_distance = max_distance
+        self._lock = threading.Lock()
+        directory = os.path.dirname(index_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(index_path, timeout=30, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS hashes ("
+            "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, "
+            "content_hash TEXT, phash INTEGER, mean_color INTEGER, last_seen INTEGER)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS hashes_content ON hashes (content_hash)")
+        self._conn.commit()
+
+    def scan(self, file_paths, workers=1):
+        """Hash any of `file_paths` that are new or changed since the last scan."""
+        from modules.parallel import ordered_map
+        known = {}
+        for path, size, mtime_ns, digest, phash, color in self._conn.execute(
+                "SELECT path, size, mtime_ns, content_hash, phash, mean_color FROM hashes"):
+            known[path] = (size, mtime_ns, digest, (phash, color) if phash is not None else None)
+
+        stale = []
+        for path in file_paths:
+            try:
+                stat_result = os.stat(path)
+            except OSError:
+                continue
+            entry = known.get(path)
+            if entry is None or entry[0] != stat_result.st_size or entry[1] != stat_result.st_mtime_ns:
+                stale.append((path, stat_result.st_size, stat_result.st_mtime_ns))
+
+        hashed = list(ordered_map(lambda item: (item, self._safe_content_hash(item[0])), stale, workers))
+
+        # Identical bytes give an identical picture: decode once per new content hash
+        phash_by_digest = {entry[2]: entry[3] for entry in known.values()}
+        to_decode = {}
+        for (path, _, _), digest in hashed:
+            if digest is not None and digest not in phash_by_digest:
+                to_decode.setdefault(digest, path)
+        decoded = ordered_map(lambda item: (item[0], self._safe_perceptual_hash(item[1])),
+                              to_decode.items(), workers)
+        phash_by_digest.update(decoded)
+
+        now = int(time.time())
+        rows = [(path, size, mtime_ns, digest) + (phash_by_digest[digest] or (None, None)) + (now,)
+                for (path, size, mtime_ns), digest in hashed if digest is not None]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO hashes (path, size, mtime_ns, content_hash, phash, mean_color, last_seen) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self._conn.commit()
+        return len(rows)
+
+    def _safe_content_hash(self, path):
+        try:
+            return content_hash(path)
+        except OSError:
+            return None
+
+    def _safe_perceptual_hash(self, path):
+        try:
+            return perceptual_hash(path)
+        except Exception:
+            return None
+
+    def prune(self, file_paths):
+        # Forget files that are no longer part of the tree
+        keep = set(file_paths)
+        with self._lock:
+            gone = [(path,) for path, in self._conn.execute("SELECT path FROM hashes") if path not in keep]
+            self._conn.executemany("DELETE FROM hashes WHERE path = ?", gone)
+            self._conn.commit()
+
+    def find_clusters(self, file_paths=None):
+        """Return {"exact": [[paths]], "similar": [[paths]]}.
+
+        "exact" groups byte-identical files. "similar" groups files whose
+        perceptual hashes are within max_distance bits and whose mean colors
+        are within COLOR_TOLERANCE, but that are not all byte-identical.
+        """
+        by_digest = {}
+        phashes = {}
+        rows = self._conn.execute("SELECT path, content_hash, phash, mean_color FROM hashes")
+        keep = set(file_paths) if file_paths is not None else None
+        for path, digest, phash, color in rows:
+            if keep is not None and path not in keep:
+                continue
+            by_digest.setdefault(digest, []).append(path)
+            if phash is not None:
+                phashes[digest] = (phash, color)
+
+        exact = sorted(sorted(paths) for paths in by_digest.values() if len(paths) > 1)
+
+        similar = []
+        for digests in self._similar_groups(phashes):
+            if len(digests) > 1:
+                similar.append(sorted(path for digest in digests for path in by_digest[digest]))
+        similar.sort()
+        return {"exact": exact, "similar": similar}
+
+    def _similar_groups(self, phashes):
+        parent = {digest: digest for digest in phashes}
+
+        def find(digest):
+            while parent[digest] != digest:
+                parent[digest] = parent[parent[digest]]
+                digest = parent[digest]
+            return digest
+
+        def union(a, b):
+            root_a, root_b = find(a), find(b)
+            if root_a != root_b:
+                parent[root_b] = root_a
+
+        # Equal signatures join directly
+        by_signature = {}
+        for digest, signature in phashes.items():
+            first = by_signature.setdefault(signature, digest)
+            if first != digest:
+                union(first, digest)
+
+        # Split the 64 bits into max_distance + 1 bands: two hashes within
+        # max_distance bits must agree on at least one band, so only hashes
+        # sharing a band bucket are compared
+        bands = self.max_distance + 1
+        band_bits = 64 // bands
+        for band in range(bands):
+            shift = band * band_bits
+            width = 64 - shift if band == bands - 1 else band_bits
+            mask = (1 << width) - 1
+            buckets = {}
+            for signature in by_signature:
+                buckets.setdefault((signature[0] >> shift) & mask, []).append(signature)
+            for members in buckets.values():
+                for i, a in enumerate(members):
+                    for b in members[i + 1:]:
+                        if (hamming(a[0], b[0]) <= self.max_distance
+                                and color_distance(a[1], b[1]) <= COLOR_TOLERANCE):
+                            union(by_signature[a], by_signature[b])
+
+        groups = {}
+        for digest in phashes:
+            groups.setdefault(find(digest), []).append(digest)
+        return list(groups.values())
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,192 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+from modules.naming_rules import normalize_formats
+
+# Reports texture files that were added, modified or removed under a folder.
+# Uses inotify on Linux and falls back to polling (size, mtime) snapshots
+# everywhere else or when inotify is unavailable.
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+              | IN_DELETE | IN_DELETE_SELF)
+
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class FolderWatcher:
+    def __init__(self, folder_path, required_format, debounce=0.3, poll_interval=1.0, use_inotify=True):
+        self.folder_path = folder_path
+        self.formats = normalize_formats(required_format)
+        self.debounce = debounce
+        self.backend = None
+        if use_inotify and sys.platform.startswith("linux"):
+            try:
+                self.backend = _InotifyBackend(self)
+            except OSError:
+                self.backend = None
+        if self.backend is None:
+            self.backend = _PollingBackend(self, poll_interval)
+
+    def wait_for_changes(self, timeout=None):
+        # Returns the set of changed texture paths, or an empty set on timeout.
+        # Events are collected until the folder has been quiet for `debounce`
+        # seconds so a multi-map export is handled as one batch.
+        changed = self.backend.read(timeout)
+        if not changed:
+            return set()
+        while True:
+            more = self.backend.read(self.debounce)
+            if not more:
+                return changed
+            changed |= more
+
+    def is_texture(self, name):
+        return name.lower().endswith(self.formats)
+
+    def snapshot(self):
+        files = {}
+        pending_dirs = [self.folder_path]
+        while pending_dirs:
+            directory = pending_dirs.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir():
+                            if not entry.is_symlink():
+                                pending_dirs.append(entry.path)
+                        elif self.is_texture(entry.name):
+                            stat_result = entry.stat()
+                            files[entry.path] = (stat_result.st_size, stat_result.st_mtime_ns)
+            except OSError:
+                continue
+        return files
+
+    def close(self):
+        self.backend.close()
+
+
+class _PollingBackend:
+    def __init__(self, watcher, poll_interval):
+        self.watcher = watcher
+        self.poll_interval = poll_interval
+        self.files = watcher.snapshot()
+        self.next_poll = time.monotonic() + poll_interval
+
+    def read(self, timeout):
+        delay = self.next_poll - time.monotonic()
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            return set()
+        if delay > 0:
+            time.sleep(delay)
+        self.next_poll = time.monotonic() + self.poll_interval
+        files = self.watcher.snapshot()
+        changed = {path for path in files.keys() ^ self.files.keys()}
+        changed.update(path for path, key in files.items() if self.files.get(path, key) != key)
+        self.files = files
+        return changed
+
+    def close(self):
+        pass
+
+
+class _InotifyBackend:
+    def __init__(self, watcher):
+        self.watcher = watcher
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watches = {}
+        self._add_tree(watcher.folder_path)
+
+    def _add_watch(self, directory):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd >= 0:
+            self.watches[wd] = directory
+
+    def _add_tree(self, directory):
+        # Returns the texture files found, so files written into a freshly
+        # created folder before its watch existed aren't missed
+        found = set()
+        pending_dirs = [directory]
+        while pending_dirs:
+            current = pending_dirs.pop()
+            self._add_watch(current)
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        if entry.is_dir():
+                            if not entry.is_symlink():
+                                pending_dirs.append(entry.path)
+                        elif self.watcher.is_texture(entry.name):
+                            found.add(entry.path)
+            except OSError:
+                continue
+        return found
+
+    def _remove_tree(self, directory):
+        prefix = os.path.join(directory, "")
+        for wd, watched in list(self.watches.items()):
+            if watched == directory or watched.startswith(prefix):
+                self.libc.inotify_rm_watch(self.fd, wd)
+                self.watches.pop(wd, None)
+
+    def read(self, timeout):
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        try:
+            data = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return set()
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, name_length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + name_length].rstrip(b"\0"))
+            offset += name_length
+            if mask & IN_Q_OVERFLOW:
+                # Lost events: report everything and let the caller revalidate
+                changed.update(self.watcher.snapshot())
+                continue
+            directory = self.watches.get(wd)
+            if directory is None:
+                continue
+            if mask & (IN_IGNORED | IN_DELETE_SELF):
+                self.watches.pop(wd, None)
+                continue
+            path = os.path.join(directory, name)
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    changed.update(self._add_tree(path))
+                elif mask & (IN_MOVED_FROM | IN_DELETE):
+                    # The folder itself is reported; the caller drops every set under it
+                    self._remove_tree(path)
+                    changed.add(path)
+            elif self.watcher.is_texture(name):
+                changed.add(path)
+        return changed
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
@@ -0,0 +1,39 @@
+import os
+import subprocess
+
+# Lists the files under a folder that git reports as changed, so CI can
+# validate only the texture sets a commit touches. Deleted and renamed-away
+# files are included: the set they belonged to has to be checked again.
+
+
+def changed_paths(folder_path, ref=None, staged=False):
+    """Return absolute paths under folder_path that differ from `ref`.
+
+    With staged=True the staged index is compared with HEAD (or `ref`)
+    instead of the working tree. Without it, untracked files count as
+    changed too. Raises RuntimeError when git fails.
+    """
+    # Outside a repository git diff would silently switch to --no-index
+    _git(folder_path, ["rev-parse", "--is-inside-work-tree"])
+    args = ["diff", "--name-only", "-z", "--no-renames", "--relative"]
+    if staged:
+        args.append("--cached")
+    if ref:
+        args.append(ref)
+    relative = _git(folder_path, args + ["--", "."])
+    if not staged:
+        relative += _git(folder_path, ["ls-files", "--others", "--exclude-standard", "-z", "--", "."])
+    folder_path = os.path.abspath(folder_path)
+    return sorted({os.path.join(folder_path, path) for path in relative})
+
+
+def _git(folder_path, args):
+    try:
+        proc = subprocess.run(["git", "-C", folder_path] + args, capture_output=True, check=True)
+    except FileNotFoundError:
+        raise RuntimeError("git is not installed")
+    except subprocess.CalledProcessError as e:
+        message = e.stderr.decode(errors="replace").strip().splitlines()
+        raise RuntimeError(message[0] if message else f"git {args[0]} failed")
+    # -z output: NUL-terminated, paths relative to folder_path
+    return [os.fsdecode(path) for path in proc.stdout.split(b"\0") if path]
@@ -0,0 +1,205 @@
+import os
+import struct
+from collections import namedtuple
+
+# Fast header-only probe for the texture formats we ship. Each parser looks at
+# the fixed-size header only and returns None when it can't make sense of it,
+# so callers can fall back to Pillow.
+
+# bytes_read: what probe_image read from the file. The parsers fill in the
+# length of the header they parsed; probe_image replaces it.
+ImageInfo = namedtuple("ImageInfo", "width height bit_depth channels format bytes_read")
+
+HEADER_SIZE = 148           # enough for DDS + DX10 extension, the largest fixed header
+EXR_HEADER_LIMIT = 65536    # EXR headers are attribute lists; give up past this
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+PSD_SIGNATURE = b"8BPS"
+DDS_SIGNATURE = b"DDS "
+EXR_SIGNATURE = b"\x76\x2f\x31\x01"
+
+TGA_IMAGE_TYPES = (1, 2, 3, 9, 10, 11)
+
+PNG_CHANNELS = {0: 1, 2: 3, 3: 3, 4: 2, 6: 4}
+
+# Channel counts for the compressed DDS formats we expect to see
+DDS_FOURCC_CHANNELS = {
+    b"DXT1": 4, b"DXT2": 4, b"DXT3": 4, b"DXT4": 4, b"DXT5": 4,
+    b"ATI1": 1, b"BC4U": 1, b"BC4S": 1,
+    b"ATI2": 2, b"BC5U": 2, b"BC5S": 2,
+}
+# Typeless variants included: Pillow writes those for BC3 and BC5
+DXGI_FORMAT_CHANNELS = {
+    27: 4, 28: 4, 29: 4,        # R8G8B8A8_TYPELESS/UNORM/UNORM_SRGB
+    70: 4, 71: 4, 72: 4,        # BC1
+    73: 4, 74: 4, 75: 4,        # BC2
+    76: 4, 77: 4, 78: 4,        # BC3
+    79: 1, 80: 1, 81: 1,        # BC4
+    82: 2, 83: 2, 84: 2,        # BC5
+    94: 3, 95: 3, 96: 3,        # BC6H
+    97: 4, 98: 4, 99: 4,        # BC7
+    60: 1, 61: 1, 48: 2, 49: 2, # R8_TYPELESS/UNORM, R8G8_TYPELESS/UNORM
+}
+DDPF_ALPHAPIXELS = 0x1
+DDPF_ALPHA = 0x2
+DDPF_FOURCC = 0x4
+DDPF_RGB = 0x40
+DDPF_LUMINANCE = 0x20000
+
+EXR_PIXEL_BITS = {0: 32, 1: 16, 2: 32}
+
+
+def probe_image(file_path):
+    """Return an ImageInfo read from the file header, or None if unrecognised."""
+    with open(file_path, "rb") as f:
+        header = read_header(f)
+    info = probe_bytes(header, os.path.splitext(file_path)[1])
+    if info is None:
+        return None
+    return info._replace(bytes_read=len(header))
+
+
+def info_from_pillow(img, bytes_read):
+    """Return an ImageInfo for an image Pillow has opened, for headers the parsers don't know."""
+    bit_depth = 16 if img.mode in ("I;16", "I;16B", "I;16L") else 8
+    return ImageInfo(img.width, img.height, bit_depth, len(img.getbands()), img.format, bytes_read)
+
+
+def read_header(f):
+    """Read as much of an open binary stream as probe_bytes needs."""
+    header = f.read(HEADER_SIZE)
+    if header.startswith(EXR_SIGNATURE):
+        header += f.read(EXR_HEADER_LIMIT - len(header))
+    return header
+
+
+def probe_bytes(header, extension=""):
+    """Parse an in-memory header. `extension` is only needed for TGA, which has no magic."""
+    try:
+        if header.startswith(PNG_SIGNATURE):
+            return _parse_png(header)
+        if header.startswith(PSD_SIGNATURE):
+            return _parse_psd(header)
+        if header.startswith(DDS_SIGNATURE):
+            return _parse_dds(header)
+        if header.startswith(EXR_SIGNATURE):
+            return _parse_exr(header)
+        if extension.lower() == ".tga":
+            return _parse_tga(header)
+    except (struct.error, IndexError, ValueError):
+        pass
+    return None
+
+
+def tga_layout(header):
+    """Return (image_type, width, height, pixel_depth, pixel_offset, top_down) for a TGA header."""
+    (id_length, colormap_type, image_type, _, colormap_length, colormap_depth,
+     _, _, width, height, pixel_depth, descriptor) = struct.unpack_from("<BBBHHBHHHHBB", header)
+    if image_type not in TGA_IMAGE_TYPES or colormap_type not in (0, 1):
+        raise ValueError("not a TGA header")
+    if width == 0 or height == 0 or pixel_depth not in (8, 15, 16, 24, 32):
+        raise ValueError("invalid TGA dimensions")
+    pixel_offset = 18 + id_length + colormap_type * colormap_length * ((colormap_depth + 7) // 8)
+    return image_type, width, height, pixel_depth, pixel_offset, bool(descriptor & 0x20)
+
+
+def _parse_tga(header):
+    image_type, width, height, pixel_depth, _, _ = tga_layout(header)
+    if image_type in (1, 9):
+        colormap_depth = header[7]
+        channels = 4 if colormap_depth == 32 else 3
+        bit_depth = 8
+    elif image_type in (3, 11):
+        channels = 2 if pixel_depth == 16 else 1
+        bit_depth = 8
+    else:
+        alpha_bits = header[17] & 0x0F
+        if pixel_depth in (15, 16):
+            channels = 4 if alpha_bits else 3
+            bit_depth = 5
+        else:
+            channels = pixel_depth // 8
+            bit_depth = 8
+    return ImageInfo(width, height, bit_depth, channels, "TGA", 18)
+
+
+def _parse_png(header):
+    length, chunk_type = struct.unpack_from(">I4s", header, 8)
+    if chunk_type != b"IHDR" or length != 13:
+        return None
+    width, height, bit_depth, color_type = struct.unpack_from(">IIBB", header, 16)
+    if color_type not in PNG_CHANNELS:
+        return None
+    return ImageInfo(width, height, bit_depth, PNG_CHANNELS[color_type], "PNG", 26)
+
+
+def _parse_psd(header):
+    version, = struct.unpack_from(">H", header, 4)
+    if version not in (1, 2):
+        return None
+    channels, height, width, depth = struct.unpack_from(">HIIH", header, 12)
+    return ImageInfo(width, height, depth, channels, "PSD", 26)
+
+
+def _parse_dds(header):
+    size, _, height, width = struct.unpack_from("<IIII", header, 4)
+    if size != 124:
+        return None
+    pf_flags, fourcc, rgb_bits = struct.unpack_from("<I4sI", header, 80)
+    if pf_flags & DDPF_FOURCC:
+        if fourcc == b"DX10":
+            dxgi_format, = struct.unpack_from("<I", header, 128)
+            channels = DXGI_FORMAT_CHANNELS.get(dxgi_format)
+            bytes_read = 148
+        else:
+            channels = DDS_FOURCC_CHANNELS.get(fourcc)
+            bytes_read = 128
+        if channels is None:
+            return None
+        return ImageInfo(width, height, 8, channels, "DDS", bytes_read)
+    if pf_flags & DDPF_RGB:
+        channels = 4 if pf_flags & DDPF_ALPHAPIXELS else 3
+    elif pf_flags & DDPF_LUMINANCE:
+        channels = 2 if pf_flags & DDPF_ALPHAPIXELS else 1
+    elif pf_flags & DDPF_ALPHA:
+        channels = 1
+    else:
+        return None
+    return ImageInfo(width, height, rgb_bits // channels, channels, "DDS", 128)
+
+
+def _parse_exr(header):
+    pos = 8
+    data_window = None
+    channel_bits = None
+    while True:
+        end = header.index(b"\0", pos)
+        name = header[pos:end]
+        if not name:
+            break
+        type_end = header.index(b"\0", end + 1)
+        attr_size, = struct.unpack_from("<i", header, type_end + 1)
+        value_start = type_end + 5
+        if value_start + attr_size > len(header):
+            return None
+        if name == b"dataWindow":
+            data_window = struct.unpack_from("<iiii", header, value_start)
+        elif name == b"channels":
+            channel_bits = _parse_exr_channels(header[value_start:value_start + attr_size])
+        pos = value_start + attr_size
+    if data_window is None or not channel_bits:
+        return None
+    x_min, y_min, x_max, y_max = data_window
+    return ImageInfo(x_max - x_min + 1, y_max - y_min + 1, max(channel_bits),
+                     len(channel_bits), "EXR", pos + 1)
+
+
+def _parse_exr_channels(value):
+    bits = []
+    pos = 0
+    while pos < len(value) and value[pos] != 0:
+        end = value.index(b"\0", pos)
+        pixel_type, = struct.unpack_from("<i", value, end + 1)
+        bits.append(EXR_PIXEL_BITS.get(pixel_type, 32))
+        pos = end + 1 + 16
+    return bits
@@ -0,0 +1,264 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+
+# Lightweight instrumentation: per-stage timers, counters and latency
+# histograms, exported as JSON or as a Prometheus textfile. Code paths that
+# run per file check `metrics.enabled` first, so the disabled NULL_METRICS
+# instance costs one attribute lookup.
+#
+# Environment variables (read by metrics_from_env / profiler_from_env):
+#   TCHECKER_METRICS_JSON   write metrics as JSON to this path after a run
+#   TCHECKER_METRICS_PROM   write a Prometheus textfile to this path
+#   TCHECKER_PROJECT        value of the "project" label (default: folder name)
+#   TCHECKER_PROFILE        "cprofile" or "pyinstrument" to profile each run
+#   TCHECKER_PROFILE_OUT    where to write the profile
+
+# Seconds; upper bounds of the latency histogram buckets
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _StageTimer:
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.add_time(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Metrics:
+    def __init__(self, enabled=True, labels=None):
+        self.enabled = enabled
+        self.labels = dict(labels or {})
+        self._lock = threading.Lock()
+        self.reset()
+
+    def __getstate__(self):
+        # Process-pool workers get an empty copy and send what they count
+        # back with each result (drain/merge)
+        return {"enabled": self.enabled, "labels": self.labels}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def reset(self):
+        self.stages = {}
+        self.counters = {}
+        self.histograms = {}
+
+    def stage(self, name):
+        if not self.enabled:
+            return _NULL_TIMER
+        return _StageTimer(self, name)
+
+    def add_time(self, name, seconds):
+        if self.enabled:
+            with self._lock:
+                self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def inc(self, name, amount=1):
+        if self.enabled:
+            with self._lock:
+                self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, name, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = {
+                    "buckets": [0] * (len(LATENCY_BUCKETS) + 1), "sum": 0.0, "count": 0
+                }
+            histogram["buckets"][bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            histogram["sum"] += seconds
+            histogram["count"] += 1
+
+    def drain(self):
+        """Return what was counted since the last drain and start again from
+        zero, or None if nothing was."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            if not (self.stages or self.counters or self.histograms):
+                return None
+            delta = (self.stages, self.counters, self.histograms)
+            self.reset()
+        return delta
+
+    def merge(self, delta):
+        """Add a drain() result from another process."""
+        if delta is None or not self.enabled:
+            return
+        stages, counters, histograms = delta
+        with self._lock:
+            for name, seconds in stages.items():
+                self.stages[name] = self.stages.get(name, 0.0) + seconds
+            for name, amount in counters.items():
+                self.counters[name] = self.counters.get(name, 0) + amount
+            for name, other in histograms.items():
+                histogram = self.histograms.get(name)
+                if histogram is None:
+                    self.histograms[name] = other
+                    continue
+                histogram["buckets"] = [a + b for a, b in zip(histogram["buckets"], other["buckets"])]
+                histogram["sum"] += other["sum"]
+                histogram["count"] += other["count"]
+
+    def cache_hit_rate(self):
+        hits = self.counters.get("probe_cache_hits", 0)
+        total = hits + self.counters.get("probe_cache_misses", 0)
+        return hits / total if total else None
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "labels": dict(self.labels),
+                "timestamp": time.time(),
+                "stages": dict(self.stages),
+                "counters": dict(self.counters),
+                "cache_hit_rate": self.cache_hit_rate(),
+                "histograms": {
+                    name: {
+                        "le": list(LATENCY_BUCKETS) + ["+Inf"],
+                        "buckets": list(histogram["buckets"]),
+                        "sum": histogram["sum"],
+                        "count": histogram["count"]
+                    }
+                    for name, histogram in self.histograms.items()
+                }
+            }
+
+    def write_json(self, path):
+        import json
+        _atomic_write(path, json.dumps(self.to_dict(), indent=4))
+
+    def write_prometheus(self, path):
+        # Textfile-collector format (node_exporter --collector.textfile)
+        data = self.to_dict()
+        labels = _format_labels(data["labels"])
+        lines = ["# TYPE tchecker_stage_seconds gauge"]
+        for stage, seconds in sorted(data["stages"].items()):
+            lines.append(f"tchecker_stage_seconds{_format_labels(data['labels'], stage=stage)} {seconds:.6f}")
+        for name, value in sorted(data["counters"].items()):
+            lines.append(f"# TYPE tchecker_{name}_total counter")
+            lines.append(f"tchecker_{name}_total{labels} {value}")
+        if data["cache_hit_rate"] is not None:
+            lines.append("# TYPE tchecker_probe_cache_hit_ratio gauge")
+            lines.append(f"tchecker_probe_cache_hit_ratio{labels} {data['cache_hit_rate']:.6f}")
+        for name, histogram in sorted(data["histograms"].items()):
+            lines.append(f"# TYPE tchecker_{name} histogram")
+            cumulative = 0
+            for bound, count in zip(histogram["le"], histogram["buckets"]):
+                cumulative += count
+                lines.append(f"tchecker_{name}_bucket{_format_labels(data['labels'], le=bound)} {cumulative}")
+            lines.append(f"tchecker_{name}_sum{labels} {histogram['sum']:.6f}")
+            lines.append(f"tchecker_{name}_count{labels} {histogram['count']}")
+        _atomic_write(path, "\n".join(lines) + "\n")
+
+    def export(self, json_path=None, prometheus_path=None):
+        # Paths not given fall back to the environment variables
+        if not self.enabled:
+            return
+        json_path = json_path or os.environ.get("TCHECKER_METRICS_JSON")
+        prometheus_path = prometheus_path or os.environ.get("TCHECKER_METRICS_PROM")
+        if json_path:
+            self.write_json(json_path)
+        if prometheus_path:
+            self.write_prometheus(prometheus_path)
+
+
+NULL_METRICS = Metrics(enabled=False)
+
+
+def metrics_from_env(project=None, enabled=False):
+    # Enabled when asked to or when an export path is set in the environment
+    if not (enabled or os.environ.get("TCHECKER_METRICS_JSON") or os.environ.get("TCHECKER_METRICS_PROM")):
+        return NULL_METRICS
+    project = os.environ.get("TCHECKER_PROJECT") or project
+    return Metrics(labels={"project": project} if project else None)
+
+
+class Profiler:
+    def __init__(self, kind, output_path=None):
+        self.kind = kind
+        self.output_path = output_path or ("tchecker.html" if kind == "pyinstrument" else "tchecker.prof")
+        self._profiler = None
+
+    def start(self):
+        if self.kind == "pyinstrument":
+            from pyinstrument import Profiler as PyinstrumentProfiler
+            self._profiler = PyinstrumentProfiler()
+            self._profiler.start()
+        else:
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def stop(self):
+        if self._profiler is None:
+            return
+        if self.kind == "pyinstrument":
+            self._profiler.stop()
+            _atomic_write(self.output_path, self._profiler.output_html())
+        else:
+            self._profiler.disable()
+            self._profiler.dump_stats(self.output_path)
+        self._profiler = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+
+def profiler_from_env():
+    kind = os.environ.get("TCHECKER_PROFILE", "").lower()
+    if kind not in ("cprofile", "pyinstrument"):
+        return None
+    return Profiler(kind, os.environ.get("TCHECKER_PROFILE_OUT"))
+
+
+def _format_labels(labels, **extra):
+    items = dict(labels, **{key: str(value) for key, value in extra.items()})
+    if not items:
+        return ""
+    body = ",".join(f'{key}="{_escape(value)}"' for key, value in sorted(items.items()))
+    return "{" + body + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _atomic_write(path, text):
+    # tempfile pulls in random and shutil; only exporting needs it
+    import tempfile
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        f.write(text)
+    os.replace(temp_path, path)
@@ -0,0 +1,164 @@
+from collections import namedtuple
+
+# Declarative texture naming rules. Each map has a canonical name, aliases
+# (BaseColor, Albedo, D, ...) and optional per-map format and resolution
+# constraints. A rule set is compiled into one index of lower-case suffixes,
+# so classifying a file name costs a hash lookup per trailing name part,
+# however many aliases exist. Names that match no alias fall back to
+# "Base_Map.ext".
+
+MapRule = namedtuple("MapRule", "name aliases formats resolution")
+
+DEFAULT_RULES = [
+    MapRule("Albedo", ("BaseColor", "Base_Color", "Diffuse", "Color", "Col", "D"), None, None),
+    MapRule("Normal", ("Nrm", "Norm", "N"), None, None),
+    MapRule("Metallic", ("Metal", "Metalness"), None, None),
+    MapRule("Roughness", ("Rough",), None, None),
+    MapRule("AO", ("AmbientOcclusion", "Occlusion"), None, None),
+]
+
+# Lower-case map names by what they hold, for checks that treat them
+# differently: tangent-space normals, and single channels of linear data
+# rather than color
+NORMAL_MAPS = ("normal",)
+SINGLE_CHANNEL_MAPS = ("metallic", "roughness", "ao", "height", "mask")
+
+SEPARATORS = "_"
+
+def normalize_formats(required_format):
+    """Turn ".tga", "tga,png" or [".tga", ".PNG"] into a sorted tuple like (".png", ".tga")."""
+    if isinstance(required_format, str):
+        required_format = required_format.split(",")
+    formats = set()
+    for extension in required_format:
+        extension = extension.strip().lower()
+        if extension:
+            formats.add(extension if extension.startswith(".") else "." + extension)
+    return tuple(sorted(formats))
+
+
+class NamingRules:
+    def __init__(self, map_rules=None, separators=SEPARATORS):
+        self.map_rules = list(DEFAULT_RULES if map_rules is None else map_rules)
+        self.separators = separators
+        self._rules_by_name = {}
+        for rule in self.map_rules:
+            for name in (rule.name,) + tuple(rule.aliases):
+                self._rules_by_name[name.lower()] = rule
+        self._compiled = {}
+
+    @classmethod
+    def from_dict(cls, data):
+        # {"Albedo": {"aliases": [...], "formats": [".png"], "resolution": 2048}, ...}
+        # Maps not listed keep their default aliases. Raises ValueError for
+        # anything else, e.g. a bare string where a list belongs, which
+        # would otherwise turn into one alias per character.
+        if not isinstance(data, dict):
+            raise ValueError("Naming rules must map each map name to its options")
+        rules = {rule.name: rule for rule in DEFAULT_RULES}
+        for name, options in data.items():
+            if not isinstance(options, dict):
+                raise ValueError(f"Naming rules for {name} must be an object like {{\"aliases\": [...]}}")
+            aliases = options.get("aliases", [])
+            formats = options.get("formats")
+            resolution = options.get("resolution")
+            if not _is_string_list(aliases):
+                raise ValueError(f"aliases of {name} must be a list of strings")
+            if formats is not None and not _is_string_list(formats):
+                raise ValueError(f"formats of {name} must be a list of strings")
+            if resolution is not None and (not isinstance(resolution, int) or isinstance(resolution, bool)
+                                           or resolution <= 0):
+                raise ValueError(f"resolution of {name} must be a positive whole number")
+            rules[name] = MapRule(
+                name,
+                tuple(aliases),
+                normalize_formats(formats) if formats else None,
+                resolution
+            )
+        return cls(list(rules.values()))
+
+    def canonical_name(self, map_name):
+        rule = self._rules_by_name.get(map_name.lower())
+        return rule.name if rule is not None else map_name
+
+    def resolution_for(self, map_name, default):
+        rule = self._rules_by_name.get(map_name.lower())
+        return rule.resolution if rule is not None and rule.resolution else default
+
+    def formats_for(self, map_name):
+        # None means any of the formats being validated
+        rule = self._rules_by_name.get(map_name.lower())
+        return rule.formats if rule is not None else None
+
+    def all_formats(self, required_format):
+        # Per-map formats are accepted on top of the requested ones
+        formats = set(normalize_formats(required_format))
+        for rule in self.map_rules:
+            formats.update(rule.formats or ())
+        return tuple(sorted(formats))
+
+    def compile(self, required_format, extra_maps=()):
+        """Return a NameMatcher for these formats; required maps without a rule
+        are matched case-insensitively too. Compiled matchers are cached."""
+        key = (self.all_formats(required_format), tuple(extra_maps))
+        matcher = self._compiled.get(key)
+        if matcher is None:
+            names = {}
+            for rule in self.map_rules:
+                for alias in (rule.name,) + tuple(rule.aliases):
+                    names.setdefault(alias.lower(), rule.name)
+            for map_name in extra_maps:
+                names.setdefault(map_name.lower(), map_name)
+            matcher = self._compiled[key] = NameMatcher(key[0], names, self.separators)
+        return matcher
+
+
+class NameMatcher:
+    def __init__(self, formats, names, separators=SEPARATORS):
+        self.formats = frozenset(formats)
+        self.separators = separators
+        # Lower-case alias -> canonical map name. An alias like "Base_Color"
+        # spans two separator-delimited parts; max_parts bounds the lookups.
+        self.suffixes = dict(names)
+        self.max_parts = 1 + max((sum(alias.count(sep) for sep in separators) for alias in names), default=0)
+
+    def is_texture(self, file_name):
+        dot = file_name.rfind(".")
+        return dot >= 0 and file_name[dot:].lower() in self.formats
+
+    def classify(self, file_name):
+        """Return (base_name, map_type) for a file name with one of the formats."""
+        dot = file_name.rfind(".")
+        stem = file_name[:dot] if dot >= 0 else file_name
+        lowered = stem.lower()
+        match = None
+        end = len(stem)
+        # One hash lookup per trailing part, right to left; the longest alias
+        # with a non-empty base name in front of it wins
+        separators = self.separators
+        for _ in range(self.max_parts):
+            if len(separators) == 1:
+                split = lowered.rfind(separators, 0, end)
+            else:
+                split = max(lowered.rfind(sep, 0, end) for sep in separators)
+            if split <= 0:
+                break
+            canonical = self.suffixes.get(lowered[split + 1:])
+            if canonical is not None:
+                match = (stem[:split], canonical)
+            end = split
+        if match is not None:
+            return match
+        return legacy_texture_info(file_name)
+
+
+def _is_string_list(value):
+    return isinstance(value, list) and all(isinstance(item, str) for item in value)
+
+
+def legacy_texture_info(file_name):
+    # Original "Name_MapType.ext" split, for suffixes no rule knows about
+    parts = file_name.split('_')
+    if len(parts) < 2:
+        return file_name.split('.')[0], "Unknown"
+    return '_'.join(parts[:-1]), parts[-1].split('.')[0]
@@ -0,0 +1,40 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+EXECUTORS = {
+    "thread": ThreadPoolExecutor,
+    "process": ProcessPoolExecutor,
+}
+
+
+def ordered_map(func, items, workers=1, executor="thread", max_in_flight=None,
+                initializer=None, initargs=()):
+    """Like map(), but fanned out to a pool.
+
+    Results come back in input order and at most `max_in_flight` items are
+    submitted ahead of the one being waited on, so `items` can be a lazy
+    generator over a huge tree.
+    """
+    if executor not in EXECUTORS:
+        raise ValueError(f"Unknown executor '{executor}', expected one of: {', '.join(EXECUTORS)}")
+    if workers <= 1:
+        if initializer is not None:
+            initializer(*initargs)
+        for item in items:
+            yield func(item)
+        return
+
+    max_in_flight = max(max_in_flight or workers * 4, workers)
+    pending = deque()
+    with EXECUTORS[executor](max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+        try:
+            for item in items:
+                pending.append(pool.submit(func, item))
+                if len(pending) >= max_in_flight:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            # Caller stopped early (or a task failed): don't run what's queued
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,165 @@
+import os
+import sqlite3
+import threading
+import time
+
+from modules.image_probe import ImageInfo
+from modules.unity_meta import ImportSettings
+
+# Bump when the meaning of cached rows changes
+CACHE_VERSION = 3
+
+
+class ProbeCache:
+    """On-disk cache of image header probes keyed by (path, size, mtime_ns).
+
+    Parsed Unity import settings are kept the same way, keyed by the .meta path.
+
+    Lookups hit SQLite directly; new entries and LRU touches are buffered and
+    written in one transaction by flush(). Safe to share between threads and
+    picklable for process pools (each process reopens the database).
+    """
+
+    def __init__(self, cache_path, max_entries=500000):
+        self.cache_path = cache_path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._reset_buffers()
+        self._open()
+
+    def _open(self):
+        directory = os.path.dirname(self.cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.cache_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS probes ("
+            "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, "
+            "width INTEGER, height INTEGER, bit_depth INTEGER, channels INTEGER, "
+            "format TEXT, last_used INTEGER)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS probes_last_used ON probes (last_used)")
+        # has_importer is 0 for .meta files without a TextureImporter section
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS import_settings ("
+            "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, has_importer INTEGER, "
+            "max_size INTEGER, compression INTEGER, srgb INTEGER, mipmaps INTEGER, "
+            "readable INTEGER, texture_type INTEGER, last_used INTEGER)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS import_settings_last_used ON import_settings (last_used)")
+        self._conn.commit()
+
+    def __getstate__(self):
+        return {"cache_path": self.cache_path, "max_entries": self.max_entries}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._reset_buffers()
+        self._open()
+
+    def set_rules_signature(self, signature):
+        # Drop everything if the rules that shaped the cached rows changed
+        signature = f"{CACHE_VERSION}:{signature}"
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'rules'").fetchone()
+            if row is not None and row[0] == signature:
+                return
+            self._conn.execute("DELETE FROM probes")
+            self._conn.execute("DELETE FROM import_settings")
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('rules', ?)", (signature,))
+            self._conn.commit()
+            self._reset_buffers()
+
+    def get(self, file_path, stat_result):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, width, height, bit_depth, channels, format "
+                "FROM probes WHERE path = ?", (file_path,)
+            ).fetchone()
+            if row is None or row[0] != stat_result.st_size or row[1] != stat_result.st_mtime_ns:
+                return None
+            self._touched.append(file_path)
+        return ImageInfo(row[2], row[3], row[4], row[5], row[6], 0)
+
+    def put(self, file_path, stat_result, info):
+        with self._lock:
+            self._pending.append((file_path, stat_result.st_size, stat_result.st_mtime_ns,
+                                  info.width, info.height, info.bit_depth, info.channels, info.format))
+
+    def get_import_settings(self, meta_path, stat_result):
+        # Returns (found, settings); settings is None for a .meta without a TextureImporter
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, has_importer, max_size, compression, srgb, mipmaps, readable, texture_type "
+                "FROM import_settings WHERE path = ?", (meta_path,)
+            ).fetchone()
+            if row is None or row[0] != stat_result.st_size or row[1] != stat_result.st_mtime_ns:
+                return False, None
+            self._touched_imports.append(meta_path)
+        return True, (ImportSettings(*row[3:]) if row[2] else None)
+
+    def put_import_settings(self, meta_path, stat_result, settings):
+        values = tuple(settings) if settings is not None else (None,) * len(ImportSettings._fields)
+        with self._lock:
+            self._pending_imports.append((meta_path, stat_result.st_size, stat_result.st_mtime_ns,
+                                          int(settings is not None)) + values)
+
+    def flush(self, min_batch=1):
+        with self._lock:
+            pending = (len(self._pending) + len(self._touched)
+                       + len(self._pending_imports) + len(self._touched_imports))
+            if pending < min_batch:
+                return
+            now = time.time_ns()
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO probes "
+                "(path, size, mtime_ns, width, height, bit_depth, channels, format, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [row + (now,) for row in self._pending]
+            )
+            self._conn.executemany("UPDATE probes SET last_used = ? WHERE path = ?",
+                                   [(now, path) for path in self._touched])
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO import_settings "
+                "(path, size, mtime_ns, has_importer, max_size, compression, srgb, mipmaps, "
+                "readable, texture_type, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [row + (now,) for row in self._pending_imports]
+            )
+            self._conn.executemany("UPDATE import_settings SET last_used = ? WHERE path = ?",
+                                   [(now, path) for path in self._touched_imports])
+            self._reset_buffers()
+            self._evict("probes")
+            self._evict("import_settings")
+            self._conn.commit()
+
+    def _reset_buffers(self):
+        self._pending = []
+        self._touched = []
+        self._pending_imports = []
+        self._touched_imports = []
+
+    def _evict(self, table):
+        count = self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        if count > self.max_entries:
+            self._conn.execute(
+                f"DELETE FROM {table} WHERE path IN "
+                f"(SELECT path FROM {table} ORDER BY last_used LIMIT ?)",
+                (count - self.max_entries,)
+            )
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM probes")
+            self._conn.execute("DELETE FROM import_settings")
+            self._conn.commit()
+            self._reset_buffers()
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,288 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Keeps every run's results in SQLite so old reports can be reopened, queried
+# and compared without validating again. Folder paths, map types and issue
+# kinds are stored once and referenced by id, so a run with 100k sets stays
+# compact; issues carry their set's folder so "Normal maps failing size in
+# folder X" is a single index range. Other processes may write to the same
+# file, so reads resolve folder and label ids in SQL rather than through the
+# id maps cached here for writing.
+
+STATUS_VALID = 0
+STATUS_INVALID = 1
+
+# Buffered results written per transaction
+WRITE_BATCH = 2000
+
+
+class ResultStore:
+    def __init__(self, store_path):
+        self.store_path = store_path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(store_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(store_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            "id INTEGER PRIMARY KEY, source TEXT, settings TEXT, started REAL, finished REAL, "
+            "sets INTEGER DEFAULT 0, invalid INTEGER DEFAULT 0, complete INTEGER DEFAULT 0)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS folders (id INTEGER PRIMARY KEY, path TEXT UNIQUE)")
+        # Map types and issue kinds
+        self._conn.execute("CREATE TABLE IF NOT EXISTS labels (id INTEGER PRIMARY KEY, value TEXT UNIQUE)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "id INTEGER PRIMARY KEY, run_id INTEGER REFERENCES runs (id) ON DELETE CASCADE, "
+            "folder_id INTEGER, name TEXT, status INTEGER, message TEXT, file_count INTEGER, "
+            "UNIQUE (run_id, folder_id, name))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS issues ("
+            "result_id INTEGER REFERENCES results (id) ON DELETE CASCADE, run_id INTEGER, "
+            "map_id INTEGER, kind_id INTEGER, folder_id INTEGER, message TEXT, path TEXT)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS issues_lookup ON issues (run_id, map_id, kind_id, folder_id)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS issues_result ON issues (result_id)")
+        self._conn.commit()
+        self._folder_ids = dict(self._conn.execute("SELECT path, id FROM folders").fetchall())
+        self._label_ids = dict(self._conn.execute("SELECT value, id FROM labels").fetchall())
+        self._pending = {}
+
+    # Recording
+
+    def begin_run(self, source, settings=None):
+        """Start recording a run and return its id."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO runs (source, settings, started) VALUES (?, ?, ?)",
+                (source, json.dumps(settings or {}), time.time())
+            )
+            self._conn.commit()
+            return cursor.lastrowid
+
+    def add_result(self, run_id, result):
+        # A later result for the same set (watch mode) replaces the earlier one
+        with self._lock:
+            self._pending[(run_id, result.get("folder", ""), result["texture_set"])] = result
+            if len(self._pending) < WRITE_BATCH:
+                return
+            self._write_pending()
+
+    def end_run(self, run_id, complete=True):
+        with self._lock:
+            self._write_pending()
+            self._conn.execute(
+                "UPDATE runs SET finished = ?, complete = ?, "
+                "sets = (SELECT COUNT(*) FROM results WHERE run_id = ?), "
+                "invalid = (SELECT COUNT(*) FROM results WHERE run_id = ? AND status = ?) "
+                "WHERE id = ?",
+                (time.time(), int(complete), run_id, run_id, STATUS_INVALID, run_id)
+            )
+            self._conn.commit()
+
+    def _write_pending(self):
+        if not self._pending:
+            return
+        # Ids are handed out here so issues can be written in the same
+        # executemany pass; BEGIN IMMEDIATE keeps other writers out meanwhile
+        self._conn.execute("BEGIN IMMEDIATE")
+        next_id = (self._conn.execute("SELECT MAX(id) FROM results").fetchone()[0] or 0) + 1
+        keys = []
+        results = []
+        issues = []
+        for (run_id, folder, name), result in self._pending.items():
+            folder_id = self._intern(folder, self._folder_ids, "folders", "path")
+            keys.append((run_id, folder_id, name))
+            if result["status"] == "removed":
+                continue
+            status = STATUS_VALID if result["status"] == "valid" else STATUS_INVALID
+            results.append((next_id, run_id, folder_id, name, status, result["message"], result.get("file_count", 0)))
+            for issue in result.get("issues", ()):
+                issues.append((next_id, run_id,
+                               self._intern(issue["map"], self._label_ids, "labels", "value"),
+                               self._intern(issue["kind"], self._label_ids, "labels", "value"),
+                               folder_id, issue["message"], issue.get("path")))
+            next_id += 1
+        self._conn.executemany("DELETE FROM results WHERE run_id = ? AND folder_id = ? AND name = ?", keys)
+        self._conn.executemany(
+            "INSERT INTO results (id, run_id, folder_id, name, status, message, file_count) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)", results
+        )
+        self._conn.executemany(
+            "INSERT INTO issues (result_id, run_id, map_id, kind_id, folder_id, message, path) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)", issues
+        )
+        self._conn.commit()
+        self._pending = {}
+
+    def _intern(self, value, ids, table, column):
+        known = ids.get(value)
+        if known is None:
+            self._conn.execute(f"INSERT OR IGNORE INTO {table} ({column}) VALUES (?)", (value,))
+            known = ids[value] = self._conn.execute(
+                f"SELECT id FROM {table} WHERE {column} = ?", (value,)
+            ).fetchone()[0]
+        return known
+
+    # Reading
+
+    def runs(self):
+        """Return runs newest first as dicts."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, source, settings, started, finished, sets, invalid, complete "
+                "FROM runs ORDER BY id DESC"
+            ).fetchall()
+        return [{"id": row[0], "source": row[1], "settings": json.loads(row[2] or "{}"),
+                 "started": row[3], "finished": row[4], "sets": row[5], "invalid": row[6],
+                 "complete": bool(row[7])} for row in rows]
+
+    def resolve_run(self, run):
+        """Return the id of `run`: an id, "latest" or "previous". Raises KeyError if there is no such run."""
+        with self._lock:
+            if run in ("latest", "previous"):
+                rows = self._conn.execute("SELECT id FROM runs ORDER BY id DESC LIMIT 2").fetchall()
+                offset = 0 if run == "latest" else 1
+                if len(rows) <= offset:
+                    raise KeyError(f"No {run} run")
+                return rows[offset][0]
+            try:
+                run_id = int(run)
+            except ValueError:
+                raise KeyError(f"No run {run}")
+            if self._conn.execute("SELECT 1 FROM runs WHERE id = ?", (run_id,)).fetchone() is None:
+                raise KeyError(f"No run {run}")
+            return run_id
+
+    def iter_results(self, run_id, invalid_only=False):
+        """Yield the run's results in the validator's result format, in the order they were recorded."""
+        with self._lock:
+            status_clause = f" AND r.status = {STATUS_INVALID}" if invalid_only else ""
+            results = self._conn.execute(
+                "SELECT r.id, f.path, r.name, r.status, r.message, r.file_count FROM results r "
+                f"JOIN folders f ON f.id = r.folder_id WHERE r.run_id = ?{status_clause} ORDER BY r.id",
+                (run_id,)
+            ).fetchall()
+            # Issues in one ordered pass, merged with the results by id
+            issues = self._conn.execute(
+                "SELECT i.result_id, lm.value, lk.value, i.message, i.path FROM issues i "
+                "JOIN labels lm ON lm.id = i.map_id JOIN labels lk ON lk.id = i.kind_id "
+                "WHERE i.run_id = ? ORDER BY i.result_id, i.rowid", (run_id,)
+            ).fetchall()
+        position = 0
+        for result_id, folder, name, status, message, file_count in results:
+            result = {
+                "texture_set": name,
+                "folder": folder,
+                "status": "valid" if status == STATUS_VALID else "invalid",
+                "message": message,
+                "file_count": file_count
+            }
+            while position < len(issues) and issues[position][0] < result_id:
+                position += 1
+            set_issues = []
+            while position < len(issues) and issues[position][0] == result_id:
+                _, map_type, kind, issue_message, path = issues[position]
+                set_issues.append({"map": map_type, "kind": kind,
+                                   "message": issue_message, "path": path})
+                position += 1
+            if status != STATUS_VALID:
+                result["details"] = [issue["message"] for issue in set_issues]
+                result["issues"] = set_issues
+            yield result
+
+    def query_issues(self, run_id, map_type=None, kind=None, folder=None, recursive=False):
+        """Return the run's issues matching every given filter as dicts with their set and folder.
+
+        With recursive=True, `folder` also matches its subfolders.
+        """
+        clauses = ["i.run_id = ?"]
+        params = [run_id]
+        for column, value in (("lm.value", map_type), ("lk.value", kind)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if folder is not None:
+            folder = os.path.normpath(folder)
+            if recursive:
+                # substr rather than LIKE, which would treat _ and % in paths as wildcards
+                clauses.append("(f.path = ? OR substr(f.path, 1, ?) = ?)")
+                params.extend((folder, len(folder) + 1, folder + os.sep))
+            else:
+                clauses.append("f.path = ?")
+                params.append(folder)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT r.name, f.path, lm.value, lk.value, i.message, i.path FROM issues i "
+                "JOIN results r ON r.id = i.result_id JOIN folders f ON f.id = i.folder_id "
+                "JOIN labels lm ON lm.id = i.map_id JOIN labels lk ON lk.id = i.kind_id "
+                f"WHERE {' AND '.join(clauses)} ORDER BY i.result_id, i.rowid", params
+            ).fetchall()
+        return [{"texture_set": row[0], "folder": row[1], "map": row[2], "kind": row[3],
+                 "message": row[4], "path": row[5]} for row in rows]
+
+    def diff(self, old_run_id, new_run_id):
+        """Compare two runs set by set.
+
+        Returns {"broken", "fixed", "added", "removed"}, each a list of
+        (folder, set name): sets valid before and invalid now, the reverse,
+        and sets only in the new or only in the old run. A partial run
+        (see is_partial) only holds the sets it re-checked, so sets missing
+        from it are neither "added" nor "removed".
+        """
+        changes = {"broken": [], "fixed": [], "added": [], "removed": []}
+        old_partial = self.is_partial(old_run_id)
+        new_partial = self.is_partial(new_run_id)
+        with self._lock:
+            # Every set of the new run against its match in the old one, and
+            # the old sets with no match; both walk the (run_id, folder_id,
+            # name) index
+            rows = self._conn.execute(
+                "SELECT f.path, n.name, o.status, n.status FROM results n "
+                "JOIN folders f ON f.id = n.folder_id "
+                "LEFT JOIN results o ON o.run_id = ? AND o.folder_id = n.folder_id AND o.name = n.name "
+                "WHERE n.run_id = ? AND (o.status IS NULL OR o.status != n.status) ORDER BY 1, 2",
+                (old_run_id, new_run_id)
+            ).fetchall()
+            removed = self._conn.execute(
+                "SELECT f.path, o.name FROM results o JOIN folders f ON f.id = o.folder_id "
+                "WHERE o.run_id = ? AND NOT EXISTS "
+                "(SELECT 1 FROM results n WHERE n.run_id = ? AND n.folder_id = o.folder_id AND n.name = o.name) "
+                "ORDER BY 1, 2", (old_run_id, new_run_id)
+            ).fetchall()
+        for folder, name, old_status, new_status in rows:
+            if old_status is None:
+                if old_partial:
+                    continue
+                change = "added"
+            else:
+                change = "broken" if new_status == STATUS_INVALID else "fixed"
+            changes[change].append((folder, name))
+        if not new_partial:
+            changes["removed"] = [tuple(row) for row in removed]
+        return changes
+
+    def is_partial(self, run_id):
+        """True for runs that only checked changed sets (--changed-since, --staged)."""
+        with self._lock:
+            row = self._conn.execute("SELECT settings FROM runs WHERE id = ?", (run_id,)).fetchone()
+        settings = json.loads(row[0] or "{}") if row is not None else {}
+        return bool(settings.get("changed_since") or settings.get("staged"))
+
+    def delete_run(self, run_id):
+        with self._lock:
+            self._conn.execute("DELETE FROM runs WHERE id = ?", (run_id,))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._write_pending()
+            self._conn.close()
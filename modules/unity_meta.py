@@ -0,0 +1,104 @@
+from collections import namedtuple
+
+from modules.naming_rules import NORMAL_MAPS, SINGLE_CHANNEL_MAPS
+
+# Unity import-settings checks. A texture's .meta file is YAML, but only a
+# handful of TextureImporter keys matter here, so instead of loading the
+# YAML each key is located with one bytes.find over the importer section.
+
+ImportSettings = namedtuple("ImportSettings", "max_size compression srgb mipmaps readable texture_type")
+
+# TextureImporter key -> ImportSettings field
+FIELDS = {
+    b"maxTextureSize": "max_size",
+    b"textureCompression": "compression",
+    b"sRGBTexture": "srgb",
+    b"enableMipMap": "mipmaps",
+    b"isReadable": "readable",
+    b"textureType": "texture_type",
+}
+
+# Keys are indented, so a leading space keeps e.g. "maxTextureSize" from
+# matching inside "spriteMaxTextureSize"
+_NEEDLES = [(b" " + key + b":", field) for key, field in FIELDS.items()]
+
+# Current importers keep the default Max Size and Compression in the
+# DefaultTexturePlatform entry of platformSettings; the top-level
+# maxTextureSize is a legacy value and only used when that entry is missing
+_PLATFORM_FIELDS = ("max_size", "compression")
+_PLATFORM_NEEDLES = [(needle, field) for needle, field in _NEEDLES if field in _PLATFORM_FIELDS]
+_DEFAULT_PLATFORM = b"buildTarget: DefaultTexturePlatform"
+
+TEXTURE_TYPE_NORMAL = 1
+COMPRESSION_NONE = 0
+
+
+def parse_meta(data):
+    """Return ImportSettings from the bytes of a .meta file, or None if it has no TextureImporter."""
+    start = data.find(b"TextureImporter:")
+    if start < 0:
+        return None
+    # Per-platform overrides repeat some keys; the importer's own come first
+    end = data.find(b"platformSettings:", start)
+    if end < 0:
+        end = len(data)
+    values = _find_values(data, _NEEDLES, start, end)
+    platform = data.find(_DEFAULT_PLATFORM, end)
+    if platform >= 0:
+        # The entry runs up to the next platform's buildTarget
+        platform_end = data.find(b"buildTarget:", platform + len(_DEFAULT_PLATFORM))
+        if platform_end < 0:
+            platform_end = len(data)
+        for field in _PLATFORM_FIELDS:
+            values.pop(field, None)
+        values.update(_find_values(data, _PLATFORM_NEEDLES, platform, platform_end))
+    return ImportSettings(*(values.get(field) for field in ImportSettings._fields))
+
+
+def _find_values(data, needles, start, end):
+    values = {}
+    for needle, field in needles:
+        index = data.find(needle, start, end)
+        if index >= 0:
+            line_end = data.find(b"\n", index)
+            try:
+                values[field] = int(data[index + len(needle):line_end if line_end >= 0 else None])
+            except ValueError:
+                pass
+    return values
+
+
+def read_meta(meta_path):
+    with open(meta_path, "rb") as f:
+        return parse_meta(f.read())
+
+
+class ImportSettingsChecker:
+    def __init__(self, require_mipmaps=True, allow_read_write=False, allow_uncompressed=False):
+        self.require_mipmaps = require_mipmaps
+        self.allow_read_write = allow_read_write
+        self.allow_uncompressed = allow_uncompressed
+
+    def check(self, map_type, settings, texture_size):
+        """Return a list of problem descriptions for one texture's import settings."""
+        if settings is None:
+            return ["No TextureImporter settings in .meta"]
+        kind = map_type.lower()
+        problems = []
+        if settings.max_size is not None and settings.max_size < texture_size:
+            problems.append(f"Max size {settings.max_size} is below the texture size {texture_size}")
+        if settings.compression == COMPRESSION_NONE and not self.allow_uncompressed:
+            problems.append("Compression is off")
+        if kind in NORMAL_MAPS and settings.texture_type != TEXTURE_TYPE_NORMAL:
+            # Normal map imports ignore the sRGB flag, anything else honours it
+            problems.append("Not imported as a Normal map")
+            if settings.srgb == 1:
+                problems.append("sRGB is on for a normal map")
+        # Data rather than color: must be imported linear
+        if kind in SINGLE_CHANNEL_MAPS and settings.srgb == 1:
+            problems.append("sRGB is on for a linear data map")
+        if settings.mipmaps == 0 and self.require_mipmaps:
+            problems.append("Mipmaps are off")
+        if settings.readable == 1 and not self.allow_read_write:
+            problems.append("Read/Write is enabled (keeps a CPU copy)")
+        return problems
@@ -0,0 +1,218 @@
+from array import array
+
+import numpy as np
+
+from modules.naming_rules import NORMAL_MAPS, SINGLE_CHANNEL_MAPS
+
+# Estimates the GPU memory textures take once imported: resolution, full
+# mip chain and block-compressed format. Per-texture rows live in a columnar
+# table (one array per column); costs, per-set, per-folder and project
+# rollups and budget checks are computed with whole-array NumPy operations.
+
+# name: (block width, block height, bytes per block); "uncompressed" uses
+# the texture's own bytes per pixel
+COMPRESSION_FORMATS = {
+    "bc1": (4, 4, 8),
+    "bc3": (4, 4, 16),
+    "bc4": (4, 4, 8),
+    "bc5": (4, 4, 16),
+    "bc7": (4, 4, 16),
+    "astc4x4": (4, 4, 16),
+    "astc5x5": (5, 5, 16),
+    "astc6x6": (6, 6, 16),
+    "astc8x8": (8, 8, 16),
+    "astc10x10": (10, 10, 16),
+    "astc12x12": (12, 12, 16),
+    "uncompressed": (1, 1, 0),
+}
+FORMAT_NAMES = list(COMPRESSION_FORMATS)
+_UNCOMPRESSED = FORMAT_NAMES.index("uncompressed")
+_BLOCK_WIDTH = np.array([COMPRESSION_FORMATS[name][0] for name in FORMAT_NAMES], dtype=np.int64)
+_BLOCK_HEIGHT = np.array([COMPRESSION_FORMATS[name][1] for name in FORMAT_NAMES], dtype=np.int64)
+_BLOCK_BYTES = np.array([COMPRESSION_FORMATS[name][2] for name in FORMAT_NAMES], dtype=np.int64)
+
+# Default format per platform and kind of map, as Unity picks them
+PLATFORM_FORMATS = {
+    "pc": {"color": "bc1", "alpha": "bc3", "normal": "bc5", "single": "bc4"},
+    "mobile": {"color": "astc6x6", "alpha": "astc6x6", "normal": "astc6x6", "single": "astc8x8"},
+}
+
+# Enough mip levels for 32768 px textures
+MAX_MIP_LEVELS = 16
+
+
+class VramTable:
+    def __init__(self, platform="pc", formats=None, mipmaps=True):
+        # formats overrides the platform default per map type, e.g. {"Albedo": "bc7"}
+        self.defaults = PLATFORM_FORMATS[platform]
+        self.formats = {map_type.lower(): name.lower() for map_type, name in (formats or {}).items()}
+        for name in self.formats.values():
+            if name not in COMPRESSION_FORMATS:
+                raise ValueError(f"Unknown compression format {name}")
+        self.mipmaps = mipmaps
+        self.clear()
+
+    def clear(self):
+        self.folders = []
+        self.set_names = []
+        self.set_folders = array("i")
+        self.map_types = []
+        self._folder_index = {}
+        self._map_index = {}
+        self._set_index = {}
+        self._format_codes = {}
+        self._set_rows = []             # (first row, end row) per set
+        # Per-texture columns, appended to as results arrive; typed arrays
+        # are handed to NumPy without copying
+        self._set_col = array("i")
+        self._map_col = array("i")
+        self._width = array("i")
+        self._height = array("i")
+        self._channels = array("B")
+        self._bit_depth = array("B")
+        self._format = array("B")
+        self._alive = bytearray()
+        self._columns = None
+
+    def add_results(self, results):
+        for result in results:
+            self.add_result(result)
+
+    def add_result(self, result):
+        """Add the "textures" of one validation result. A set seen before is
+        replaced; status "removed" drops it."""
+        key = (result.get("folder", ""), result["texture_set"])
+        previous = self._set_index.pop(key, None)
+        if previous is not None:
+            start, end = self._set_rows[previous]
+            self._alive[start:end] = bytes(end - start)
+            self._columns = None
+        textures = result.get("textures")
+        if result["status"] == "removed" or not textures:
+            return
+        folder = self._folder_index.get(key[0])
+        if folder is None:
+            folder = self._folder_index[key[0]] = len(self.folders)
+            self.folders.append(key[0])
+        set_index = self._set_index[key] = len(self.set_names)
+        self.set_names.append(key[1])
+        self.set_folders.append(folder)
+        start = len(self._set_col)
+        for map_type, width, height, channels, bit_depth in textures:
+            map_index = self._map_index.get(map_type)
+            if map_index is None:
+                map_index = self._map_index[map_type] = len(self.map_types)
+                self.map_types.append(map_type)
+            self._set_col.append(set_index)
+            self._map_col.append(map_index)
+            self._width.append(width)
+            self._height.append(height)
+            self._channels.append(channels)
+            self._bit_depth.append(bit_depth)
+            code = self._format_codes.get((map_type, channels))
+            if code is None:
+                code = self._format_codes[map_type, channels] = FORMAT_NAMES.index(self._format_for(map_type, channels))
+            self._format.append(code)
+        self._set_rows.append((start, len(self._set_col)))
+        self._alive.extend(b"\x01" * (len(self._set_col) - start))
+        self._columns = None
+
+    def _format_for(self, map_type, channels):
+        kind = map_type.lower()
+        if kind in self.formats:
+            return self.formats[kind]
+        if kind in NORMAL_MAPS:
+            return self.defaults["normal"]
+        if kind in SINGLE_CHANNEL_MAPS or channels == 1:
+            return self.defaults["single"]
+        return self.defaults["alpha" if channels in (2, 4) else "color"]
+
+    def columns(self):
+        """Return the table as a dict of NumPy arrays, one row per live texture, with its "bytes"."""
+        if self._columns is not None:
+            return self._columns
+        alive = np.frombuffer(self._alive, dtype=bool)
+        columns = {
+            "set": np.frombuffer(self._set_col, dtype=np.int32)[alive],
+            "map": np.frombuffer(self._map_col, dtype=np.int32)[alive],
+            "width": np.frombuffer(self._width, dtype=np.int32)[alive],
+            "height": np.frombuffer(self._height, dtype=np.int32)[alive],
+            "channels": np.frombuffer(self._channels, dtype=np.uint8)[alive],
+            "bit_depth": np.frombuffer(self._bit_depth, dtype=np.uint8)[alive],
+            "format": np.frombuffer(self._format, dtype=np.uint8)[alive],
+        }
+        columns["bytes"] = self._estimate(columns)
+        self._columns = columns
+        return columns
+
+    def _estimate(self, columns):
+        # Projects reuse a handful of sizes and formats, so the cost is worked
+        # out once per distinct (width, height, format, bytes per pixel) and
+        # gathered back to every row
+        channels = columns["channels"].astype(np.int64)
+        # GPUs have no 3-byte formats: uncompressed RGB is stored as RGBA
+        bytes_per_pixel = np.where(channels == 3, 4, channels) * columns["bit_depth"] // 8
+        keys = ((columns["width"].astype(np.int64) << 36) | (columns["height"].astype(np.int64) << 16)
+                | (columns["format"].astype(np.int64) << 8) | bytes_per_pixel)
+        keys, inverse = np.unique(keys, return_inverse=True)
+        width = keys >> 36
+        height = (keys >> 16) & 0xFFFFF
+        codes = (keys >> 8) & 0xFF
+        block_width = _BLOCK_WIDTH[codes]
+        block_height = _BLOCK_HEIGHT[codes]
+        block_bytes = np.where(codes == _UNCOMPRESSED, keys & 0xFF, _BLOCK_BYTES[codes])
+
+        total = np.zeros(len(keys), dtype=np.int64)
+        levels = MAX_MIP_LEVELS if self.mipmaps else 1
+        # One pass per mip level over all sizes at once; levels past 1x1 are
+        # masked out
+        active = np.ones(len(keys), dtype=bool)
+        for _ in range(levels):
+            blocks = ((width + block_width - 1) // block_width) * ((height + block_height - 1) // block_height)
+            total += np.where(active, blocks * block_bytes, 0)
+            active &= (width > 1) | (height > 1)
+            if not active.any():
+                break
+            width = np.maximum(width >> 1, 1)
+            height = np.maximum(height >> 1, 1)
+        return total[inverse.reshape(-1)]
+
+    def rollup(self):
+        """Return {"sets": bytes per set, "folders": bytes per folder, "project": total bytes}."""
+        columns = self.columns()
+        set_bytes = np.bincount(columns["set"], weights=columns["bytes"], minlength=len(self.set_names))
+        set_folders = np.frombuffer(self.set_folders, dtype=np.int32)
+        folder_bytes = np.bincount(set_folders, weights=set_bytes, minlength=len(self.folders))
+        return {
+            "sets": set_bytes.astype(np.int64),
+            "folders": folder_bytes.astype(np.int64),
+            "project": int(columns["bytes"].sum())
+        }
+
+    def by_map_type(self):
+        columns = self.columns()
+        totals = np.bincount(columns["map"], weights=columns["bytes"], minlength=len(self.map_types))
+        return {map_type: int(total) for map_type, total in zip(self.map_types, totals)}
+
+    def over_budget(self, set_budget=None, folder_budget=None, project_budget=None):
+        """Return a list of {"scope", "name", "bytes", "budget"} for everything over its budget (bytes)."""
+        totals = self.rollup()
+        exceeded = []
+        if set_budget is not None:
+            # Replaced and removed sets add up to 0 bytes
+            for index in np.nonzero(totals["sets"] > set_budget)[0]:
+                exceeded.append({"scope": "set", "name": self.set_names[index],
+                                 "folder": self.folders[self.set_folders[index]],
+                                 "bytes": int(totals["sets"][index]), "budget": set_budget})
+        if folder_budget is not None:
+            for index in np.nonzero(totals["folders"] > folder_budget)[0]:
+                exceeded.append({"scope": "folder", "name": self.folders[index],
+                                 "bytes": int(totals["folders"][index]), "budget": folder_budget})
+        if project_budget is not None and totals["project"] > project_budget:
+            exceeded.append({"scope": "project", "name": "", "bytes": totals["project"], "budget": project_budget})
+        return exceeded
+
+    def live_sets(self):
+        # (set index, folder, set name) for sets not replaced or removed
+        for (folder, name), index in self._set_index.items():
+            yield index, folder, name
@@ -0,0 +1,210 @@
+import struct
+
+import pytest
+from PIL import Image
+
+from benchmarks.synthetic import write_png, write_tga
+from modules.image_probe import HEADER_SIZE, ImageInfo, info_from_pillow, probe_bytes, probe_image
+from modules.texture_validator import TextureValidator
+
+
+def pillow_info(path):
+    with Image.open(path) as img:
+        return img.size, img.mode
+
+
+def expected_bytes_read(path):
+    return min(path.stat().st_size, HEADER_SIZE)
+
+
+def write_psd(path, width, height, channels=3, depth=8):
+    # Pillow reads PSD but can't write it: header, empty sections, raw planes
+    plane = bytes(width * height * depth // 8)
+    with open(path, "wb") as f:
+        f.write(b"8BPS" + struct.pack(">H6xHIIHH", 1, channels, height, width, depth, 3))
+        f.write(struct.pack(">III", 0, 0, 0))
+        f.write(struct.pack(">H", 0) + plane * channels)
+
+
+def exr_attribute(name, kind, value):
+    return name + b"\0" + kind + b"\0" + struct.pack("<i", len(value)) + value
+
+
+def write_exr(path, width, height, channel_names=b"BGR", pixel_type=1, padding=0):
+    channels = b"".join(bytes([name]) + b"\0" + struct.pack("<iB3xii", pixel_type, 0, 1, 1)
+                        for name in channel_names) + b"\0"
+    window = struct.pack("<iiii", 0, 0, width - 1, height - 1)
+    header = (b"\x76\x2f\x31\x01" + struct.pack("<I", 2)
+              + exr_attribute(b"channels", b"chlist", channels)
+              + exr_attribute(b"compression", b"compression", b"\0")
+              + exr_attribute(b"dataWindow", b"box2i", window)
+              + exr_attribute(b"displayWindow", b"box2i", window)
+              + exr_attribute(b"lineOrder", b"lineOrder", b"\0")
+              # Pushes the header past the fixed-size read
+              + exr_attribute(b"comments", b"string", b"x" * padding)
+              + b"\0")
+    with open(path, "wb") as f:
+        f.write(header)
+        f.write(bytes(8 * height))
+
+
+# TGA
+
+@pytest.mark.parametrize("mode, channels", [("L", 1), ("LA", 2), ("RGB", 3), ("RGBA", 4)])
+@pytest.mark.parametrize("compression", [None, "tga_rle"])
+def test_tga_pillow(tmp_path, mode, channels, compression):
+    path = tmp_path / "Rock_Albedo.tga"
+    Image.new(mode, (64, 32)).save(path, compression=compression)
+    info = probe_image(path)
+    assert (info.width, info.height) == pillow_info(path)[0]
+    assert (info.channels, info.bit_depth, info.format) == (channels, 8, "TGA")
+    assert info.bytes_read == expected_bytes_read(path)
+
+
+def test_tga_colormap(tmp_path):
+    path = tmp_path / "Rock_Albedo.tga"
+    image = Image.new("P", (48, 80))
+    image.putpalette(bytes(range(256)) * 3)
+    image.save(path)
+    assert pillow_info(path) == ((48, 80), "P")
+    info = probe_image(path)
+    assert (info.width, info.height, info.channels, info.bit_depth) == (48, 80, 3, 8)
+
+
+@pytest.mark.parametrize("channels", [1, 3, 4])
+@pytest.mark.parametrize("pixel_data", [True, False])
+def test_tga_synthetic(tmp_path, channels, pixel_data):
+    path = tmp_path / "Rock_Albedo.tga"
+    write_tga(path, 256, 128, channels, pixel_data)
+    info = probe_image(path)
+    assert (info.width, info.height, info.channels) == (256, 128, channels)
+    if pixel_data:
+        assert pillow_info(path)[0] == (256, 128)
+
+
+def test_tga_needs_extension(tmp_path):
+    path = tmp_path / "Rock_Albedo.bin"
+    Image.new("RGB", (8, 8)).save(path, format="TGA")
+    assert probe_image(path) is None
+
+
+# PNG
+
+@pytest.mark.parametrize("mode, channels, bit_depth", [
+    ("L", 1, 8), ("LA", 2, 8), ("RGB", 3, 8), ("RGBA", 4, 8), ("P", 3, 8), ("I;16", 1, 16),
+])
+def test_png_pillow(tmp_path, mode, channels, bit_depth):
+    path = tmp_path / "Rock_Albedo.png"
+    image = Image.new(mode, (300, 200))
+    if mode == "P":
+        image.putpalette(bytes(range(256)) * 3)
+    image.save(path)
+    info = probe_image(path)
+    assert (info.width, info.height) == pillow_info(path)[0] == (300, 200)
+    assert (info.channels, info.bit_depth, info.format) == (channels, bit_depth, "PNG")
+    assert info.bytes_read == expected_bytes_read(path)
+
+
+@pytest.mark.parametrize("channels", [1, 2, 3, 4])
+def test_png_synthetic(tmp_path, channels):
+    path = tmp_path / "Rock_Albedo.png"
+    write_png(path, 512, 256, channels)
+    info = probe_image(path)
+    assert (info.width, info.height, info.channels) == (512, 256, channels)
+    assert pillow_info(path)[0] == (512, 256)
+
+
+# PSD
+
+@pytest.mark.parametrize("channels, depth", [(3, 8), (4, 8), (3, 16)])
+def test_psd(tmp_path, channels, depth):
+    path = tmp_path / "Rock_Albedo.psd"
+    write_psd(path, 40, 24, channels, depth)
+    if depth == 8:
+        # Pillow only reads 8-bit PSD
+        assert pillow_info(path)[0] == (40, 24)
+    info = probe_image(path)
+    assert (info.width, info.height, info.channels, info.bit_depth, info.format) == (40, 24, channels, depth, "PSD")
+
+
+# DDS
+
+@pytest.mark.parametrize("mode, pixel_format, channels", [
+    ("RGB", None, 3), ("RGBA", None, 4), ("L", None, 1), ("LA", None, 2),
+    ("RGB", "DXT1", 4), ("RGBA", "DXT5", 4),
+])
+def test_dds_legacy(tmp_path, mode, pixel_format, channels):
+    path = tmp_path / "Rock_Albedo.dds"
+    Image.new(mode, (128, 64)).save(path, pixel_format=pixel_format)
+    assert pillow_info(path)[0] == (128, 64)
+    info = probe_image(path)
+    assert (info.width, info.height, info.channels, info.format) == (128, 64, channels, "DDS")
+    assert info.bytes_read == expected_bytes_read(path)
+
+
+@pytest.mark.parametrize("mode, pixel_format, channels", [("RGB", "BC5", 2), ("RGBA", "BC3", 4)])
+def test_dds_dx10(tmp_path, mode, pixel_format, channels):
+    path = tmp_path / "Rock_Normal.dds"
+    Image.new(mode, (128, 64)).save(path, pixel_format=pixel_format)
+    with open(path, "rb") as f:
+        assert f.read(88)[84:] == b"DX10"
+    assert pillow_info(path)[0] == (128, 64)
+    info = probe_image(path)
+    assert (info.width, info.height, info.channels) == (128, 64, channels)
+
+
+# EXR
+
+@pytest.mark.parametrize("channel_names, pixel_type, bit_depth", [(b"BGR", 1, 16), (b"ABGR", 2, 32), (b"Y", 1, 16)])
+def test_exr(tmp_path, channel_names, pixel_type, bit_depth):
+    path = tmp_path / "Sky_Albedo.exr"
+    write_exr(path, 96, 48, channel_names, pixel_type)
+    info = probe_image(path)
+    assert (info.width, info.height, info.channels, info.bit_depth, info.format) == (
+        96, 48, len(channel_names), bit_depth, "EXR")
+
+
+def test_exr_long_header(tmp_path):
+    # Headers longer than the fixed read are read up to EXR_HEADER_LIMIT
+    path = tmp_path / "Sky_Albedo.exr"
+    write_exr(path, 96, 48, padding=4000)
+    info = probe_image(path)
+    assert (info.width, info.height) == (96, 48)
+    assert info.bytes_read == path.stat().st_size
+
+
+# Fallback
+
+def test_unknown_header():
+    assert probe_bytes(b"BM" + bytes(146), ".bmp") is None
+    assert probe_bytes(b"\x89PNG\r\n\x1a\n" + bytes(4), ".png") is None
+    assert probe_bytes(bytes(10), ".tga") is None
+
+
+def test_pillow_fallback(tmp_path):
+    path = tmp_path / "Rock_Albedo.bmp"
+    Image.new("RGB", (70, 30)).save(path)
+    assert probe_image(path) is None
+    info = TextureValidator()._probe_file(str(path))
+    assert (info.width, info.height, info.channels, info.format) == (70, 30, 3, "BMP")
+    assert info.bytes_read > 0
+
+
+def test_info_from_pillow(tmp_path):
+    path = tmp_path / "Rock_Height.png"
+    Image.new("I;16", (20, 10)).save(path)
+    with Image.open(path) as img:
+        assert info_from_pillow(img, 99) == ImageInfo(20, 10, 16, 1, "PNG", 99)
+
+
+def test_archive_pillow_fallback(tmp_path):
+    import zipfile
+    from modules.archive_source import iter_archive
+    image_path = tmp_path / "Rock_Albedo.bmp"
+    Image.new("RGB", (70, 30)).save(image_path)
+    archive_path = tmp_path / "textures.zip"
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        archive.write(image_path, "Assets/Rock_Albedo.bmp")
+    (member, info), = iter_archive(str(archive_path), lambda name: name.endswith(".bmp"))
+    assert member == "Assets/Rock_Albedo.bmp"
+    assert (info.width, info.height, info.channels, info.format) == (70, 30, 3, "BMP")
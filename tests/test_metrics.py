@@ -0,0 +1,31 @@
+import pickle
+
+from modules.metrics import NULL_METRICS, Metrics
+
+
+def test_drain_and_merge():
+    worker = pickle.loads(pickle.dumps(Metrics(labels={"project": "p"})))
+    assert worker.enabled and worker.labels == {"project": "p"}
+    assert worker.drain() is None
+    worker.inc("files_probed", 3)
+    worker.add_time("walk", 0.5)
+    worker.observe("probe_seconds", 0.002)
+    delta = worker.drain()
+    assert worker.counters == {} and worker.drain() is None
+
+    parent = Metrics()
+    parent.inc("files_probed")
+    parent.observe("probe_seconds", 0.002)
+    parent.merge(delta)
+    parent.merge(None)
+    assert parent.counters == {"files_probed": 4}
+    assert parent.stages == {"walk": 0.5}
+    histogram = parent.histograms["probe_seconds"]
+    assert histogram["count"] == 2 and sum(histogram["buckets"]) == 2
+
+
+def test_disabled_metrics_stay_disabled():
+    copy = pickle.loads(pickle.dumps(NULL_METRICS))
+    assert not copy.enabled
+    copy.inc("files_probed")
+    assert copy.drain() is None
@@ -0,0 +1,97 @@
+import pytest
+
+from modules.naming_rules import NamingRules, legacy_texture_info, normalize_formats
+
+
+@pytest.fixture
+def matcher():
+    return NamingRules().compile(".tga,.png")
+
+
+@pytest.mark.parametrize("file_name, expected", [
+    ("Rock_Albedo.tga", ("Rock", "Albedo")),
+    ("Rock_albedo.tga", ("Rock", "Albedo")),
+    ("Rock_BaseColor.tga", ("Rock", "Albedo")),
+    ("Rock_Base_Color.tga", ("Rock", "Albedo")),
+    ("Rock_D.png", ("Rock", "Albedo")),
+    ("Rock_Col.tga", ("Rock", "Albedo")),
+    ("Rock_Nrm.tga", ("Rock", "Normal")),
+    ("Rock_N.tga", ("Rock", "Normal")),
+    ("Rock_Metalness.tga", ("Rock", "Metallic")),
+    ("Rock_Rough.tga", ("Rock", "Roughness")),
+    ("Rock_AmbientOcclusion.tga", ("Rock", "AO")),
+    ("Big_Rock_Normal.tga", ("Big_Rock", "Normal")),
+    # The longest alias wins: "Base_Color", not "Color" with base "Rock_Base"
+    ("Rock_base_color.tga", ("Rock", "Albedo")),
+    # Base names keep their case
+    ("ROCK_normal.TGA", ("ROCK", "Normal")),
+])
+def test_classify_aliases(matcher, file_name, expected):
+    assert matcher.classify(file_name) == expected
+
+
+@pytest.mark.parametrize("file_name", ["Rock_Emissive.tga", "Rock.tga", "Rock_Detail_Mask.tga", "Normal.tga", "_Normal.tga"])
+def test_classify_legacy_fallback(matcher, file_name):
+    # Suffixes no rule knows about, and names with no base before the alias,
+    # split the way the original tool did
+    assert matcher.classify(file_name) == legacy_texture_info(file_name)
+
+
+def test_legacy_texture_info():
+    assert legacy_texture_info("Rock_Emissive.tga") == ("Rock", "Emissive")
+    assert legacy_texture_info("Big_Rock_Mask.tga") == ("Big_Rock", "Mask")
+    assert legacy_texture_info("Rock.tga") == ("Rock", "Unknown")
+
+
+def test_is_texture(matcher):
+    assert matcher.is_texture("Rock_Albedo.TGA")
+    assert matcher.is_texture("Rock_Albedo.png")
+    assert not matcher.is_texture("Rock_Albedo.tga.meta")
+    assert not matcher.is_texture("README")
+
+
+def test_extra_maps_are_case_insensitive():
+    matcher = NamingRules().compile(".tga", extra_maps=["Emissive"])
+    assert matcher.classify("Rock_emissive.tga") == ("Rock", "Emissive")
+
+
+def test_normalize_formats():
+    assert normalize_formats(".tga") == (".tga",)
+    assert normalize_formats("tga, .PNG") == (".png", ".tga")
+    assert normalize_formats([".PNG", "tga", ""]) == (".png", ".tga")
+
+
+def test_from_dict():
+    rules = NamingRules.from_dict({
+        "Albedo": {"aliases": ["Diff"]},
+        "Normal": {"formats": ["PNG"], "resolution": 2048},
+        "Emissive": {"aliases": ["Glow"]},
+    })
+    matcher = rules.compile(".tga")
+    assert matcher.classify("Rock_Diff.tga") == ("Rock", "Albedo")
+    # Listing a map replaces its default aliases; unlisted maps keep theirs
+    assert matcher.classify("Rock_BaseColor.tga") == ("Rock", "BaseColor")
+    assert matcher.classify("Rock_Nrm.tga") == ("Rock", "Nrm")
+    assert matcher.classify("Rock_Rough.tga") == ("Rock", "Roughness")
+    assert matcher.classify("Rock_Glow.tga") == ("Rock", "Emissive")
+    assert rules.canonical_name("emissive") == "Emissive"
+    assert rules.formats_for("Normal") == (".png",)
+    assert rules.formats_for("Albedo") is None
+    assert rules.all_formats(".tga") == (".png", ".tga")
+    assert rules.resolution_for("normal", 1024) == 2048
+    assert rules.resolution_for("Albedo", 1024) == 1024
+
+
+@pytest.mark.parametrize("data", [
+    ["Albedo"],
+    {"Albedo": ["BaseColor"]},
+    {"Albedo": {"aliases": "BaseColor"}},
+    {"Albedo": {"aliases": ["BaseColor", 3]}},
+    {"Normal": {"formats": ".png"}},
+    {"Normal": {"resolution": "2048"}},
+    {"Normal": {"resolution": 0}},
+    {"Normal": {"resolution": True}},
+])
+def test_from_dict_rejects_malformed_rules(data):
+    with pytest.raises(ValueError):
+        NamingRules.from_dict(data)
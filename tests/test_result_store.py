@@ -0,0 +1,99 @@
+import os
+
+import pytest
+
+from modules.result_store import ResultStore
+
+
+def result(name, folder, issues=()):
+    issues = [{"map": map_type, "kind": kind, "message": f"{map_type} {kind}", "path": None}
+              for map_type, kind in issues]
+    return {"texture_set": name, "folder": folder, "status": "invalid" if issues else "valid",
+            "message": "Missing maps" if issues else "All maps present", "issues": issues,
+            "file_count": 2}
+
+
+def record(store, results, settings=None):
+    run_id = store.begin_run("project", settings)
+    for item in results:
+        store.add_result(run_id, item)
+    store.end_run(run_id)
+    return run_id
+
+
+@pytest.fixture
+def stores(tmp_path):
+    # Two stores on one file, like the GUI and cli.py --store
+    path = str(tmp_path / "results.db")
+    first = ResultStore(path)
+    second = ResultStore(path)
+    yield first, second
+    first.close()
+    second.close()
+
+
+def test_reads_rows_written_by_another_instance(stores):
+    first, second = stores
+    folder = os.path.join("Assets", "Props")
+    run_id = record(second, [result("Rock", folder, [("Normal", "size")]), result("Tree", folder)])
+    assert first.resolve_run("latest") == run_id
+    results = list(first.iter_results(run_id))
+    assert [(item["folder"], item["texture_set"], item["status"]) for item in results] == [
+        (folder, "Rock", "invalid"), (folder, "Tree", "valid")]
+    assert results[0]["issues"] == [{"map": "Normal", "kind": "size", "message": "Normal size", "path": None}]
+    assert [item["texture_set"] for item in first.iter_results(run_id, invalid_only=True)] == ["Rock"]
+
+
+def test_query_issues(stores):
+    first, second = stores
+    props = os.path.join("Assets", "Props")
+    rocks = os.path.join(props, "Rocks")
+    run_id = record(second, [
+        result("Rock", rocks, [("Normal", "size"), ("AO", "missing")]),
+        result("Crate", props, [("Normal", "format")]),
+        result("Wall", os.path.join("Assets", "Props_Old"), [("Normal", "size")]),
+    ])
+    assert [issue["texture_set"] for issue in first.query_issues(run_id, map_type="Normal")] == ["Rock", "Crate", "Wall"]
+    assert [issue["map"] for issue in first.query_issues(run_id, kind="missing")] == ["AO"]
+    assert first.query_issues(run_id, map_type="Normal", kind="size", folder=props) == []
+    found = first.query_issues(run_id, map_type="Normal", folder=props, recursive=True)
+    assert [(issue["folder"], issue["texture_set"]) for issue in found] == [(rocks, "Rock"), (props, "Crate")]
+    assert first.query_issues(run_id, map_type="Albedo") == []
+
+
+def test_diff(stores):
+    first, second = stores
+    old_run = record(first, [result("Rock", "A"), result("Tree", "A", [("AO", "missing")]),
+                             result("Bush", "A"), result("Gone", "B")])
+    new_run = record(second, [result("Rock", "A", [("Normal", "size")]), result("Tree", "A"),
+                              result("Bush", "A"), result("New", "C")])
+    assert first.diff(old_run, new_run) == {
+        "broken": [("A", "Rock")],
+        "fixed": [("A", "Tree")],
+        "added": [("C", "New")],
+        "removed": [("B", "Gone")],
+    }
+
+
+def test_resolve_run(stores):
+    first, _ = stores
+    with pytest.raises(KeyError):
+        first.resolve_run("latest")
+    older = record(first, [result("Rock", "A")])
+    newer = record(first, [result("Rock", "A")])
+    assert first.resolve_run("latest") == newer
+    assert first.resolve_run("previous") == older
+    assert first.resolve_run(str(older)) == older
+    with pytest.raises(KeyError):
+        first.resolve_run("nope")
+
+
+def test_diff_partial_run(stores):
+    first, _ = stores
+    full = record(first, [result("Rock", "A"), result("Tree", "A"), result("Bush", "B")])
+    partial = record(first, [result("Rock", "A", [("Normal", "size")]), result("New", "C")],
+                     {"changed_since": "origin/main", "staged": False})
+    assert first.is_partial(partial) and not first.is_partial(full)
+    # Tree and Bush weren't re-checked, so they aren't "removed"
+    assert first.diff(full, partial) == {"broken": [("A", "Rock")], "fixed": [], "added": [("C", "New")], "removed": []}
+    assert first.diff(partial, full) == {"broken": [], "fixed": [("A", "Rock")], "added": [], "removed": [("C", "New")]}
@@ -0,0 +1,60 @@
+import pytest
+
+from benchmarks.synthetic import write_tga
+from modules.texture_validator import TextureValidator
+
+MAPS = ["Albedo", "Normal"]
+
+
+@pytest.fixture
+def per_type_folders(tmp_path):
+    # Maps kept in one folder per map type
+    for map_type in MAPS:
+        (tmp_path / map_type).mkdir()
+        write_tga(tmp_path / map_type / f"Rock_{map_type}.tga", 64, 64, pixel_data=False)
+    return str(tmp_path)
+
+
+def test_group_by_folder(per_type_folders):
+    results = list(TextureValidator().iter_validate(per_type_folders, MAPS, 64, ".tga"))
+    assert [(result["texture_set"], result["status"]) for result in results] == [
+        ("Rock", "invalid"), ("Rock", "invalid")]
+
+
+def test_group_whole_tree(per_type_folders):
+    validator = TextureValidator()
+    streamed = list(validator.iter_validate(per_type_folders, MAPS, 64, ".tga", group_by_folder=False))
+    assert [(result["texture_set"], result["status"]) for result in streamed] == [("Rock", "valid")]
+    assert streamed == validator.validate_folder(per_type_folders, MAPS, 64, ".tga")
+
+
+def test_content_checks_skip_formats_pillow_cannot_decode(tmp_path):
+    pytest.importorskip("numpy")
+    from modules.content_checks import ContentChecker
+    from test_image_probe import write_exr
+    for map_type in MAPS:
+        write_exr(tmp_path / f"Sky_{map_type}.exr", 64, 64)
+    # Broken file in a format Pillow does decode
+    (tmp_path / "Bad_Albedo.png").write_bytes(b"\x89PNG\r\n\x1a\n" + bytes(40))
+    (tmp_path / "Bad_Normal.png").write_bytes((tmp_path / "Bad_Albedo.png").read_bytes())
+    validator = TextureValidator(content_checker=ContentChecker())
+    results = {result["texture_set"]: result
+               for result in validator.iter_validate(str(tmp_path), MAPS, 64, ".exr,.png")}
+    assert results["Sky"]["status"] == "valid"
+    assert results["Sky"]["notes"] == [f"{map_type}: Content checks skipped, can't decode EXR" for map_type in MAPS]
+    assert results["Bad"]["status"] == "invalid"
+
+
+def test_process_workers_report_metrics(tmp_path):
+    from benchmarks.synthetic import generate_tree
+    from modules.metrics import Metrics
+    generate_tree(str(tmp_path), 12, resolution=64, pixel_data=False, sets_per_folder=4)
+    counters = {}
+    for executor in ("thread", "process"):
+        metrics = Metrics()
+        validator = TextureValidator(metrics=metrics)
+        list(validator.iter_validate(str(tmp_path), MAPS, 64, ".tga", workers=2, executor=executor))
+        counters[executor] = metrics.counters
+        assert metrics.histograms["probe_seconds"]["count"] == metrics.counters["files_probed"]
+    assert counters["process"] == counters["thread"]
+    assert counters["process"]["sets_validated"] == 12
@@ -0,0 +1,138 @@
+import pytest
+
+from modules.unity_meta import ImportSettings, ImportSettingsChecker, parse_meta, read_meta
+
+# Trimmed from a Unity 2021.3 texture .meta: the legacy top-level
+# maxTextureSize says 2048, the DefaultTexturePlatform entry 1024 with
+# compression off, and a Standalone override 4096 with compression on
+TEXTURE_META = b"""\
+fileFormatVersion: 2
+guid: 0f1e2d3c4b5a69788796a5b4c3d2e1f0
+TextureImporter:
+  internalIDToNameTable: []
+  externalObjects: {}
+  serializedVersion: 12
+  mipmaps:
+    mipMapMode: 0
+    enableMipMap: 1
+    sRGBTexture: 1
+    linearTexture: 0
+    fadeOut: 0
+  bumpmap:
+    convertToNormalMap: 0
+    heightScale: 0.25
+  isReadable: 0
+  streamingMipmaps: 0
+  textureFormat: 1
+  maxTextureSize: 2048
+  textureSettings:
+    serializedVersion: 2
+    filterMode: 1
+    aniso: 1
+  nPOTScale: 1
+  compressionQuality: 50
+  spriteMode: 0
+  spritePixelsToUnits: 100
+  alphaUsage: 1
+  textureType: 0
+  textureShape: 1
+  maxTextureSizeSet: 0
+  compressionQualitySet: 0
+  platformSettings:
+  - serializedVersion: 3
+    buildTarget: DefaultTexturePlatform
+    maxTextureSize: 1024
+    resizeAlgorithm: 0
+    textureFormat: -1
+    textureCompression: 0
+    compressionQuality: 50
+    crunchedCompression: 0
+    overridden: 0
+  - serializedVersion: 3
+    buildTarget: Standalone
+    maxTextureSize: 4096
+    resizeAlgorithm: 0
+    textureFormat: -1
+    textureCompression: 1
+    overridden: 1
+  spriteSheet:
+    serializedVersion: 2
+    sprites: []
+  spritePackingTag:
+  userData:
+  assetBundleName:
+  assetBundleVariant:
+"""
+
+
+def legacy_meta(**values):
+    # An older importer: no platformSettings, settings only at the top level
+    lines = [b"fileFormatVersion: 2", b"TextureImporter:"]
+    lines += [b"  %s: %s" % (key.encode(), str(value).encode()) for key, value in values.items()]
+    return b"\n".join(lines) + b"\n"
+
+
+def test_platform_entry_overrides_top_level(tmp_path):
+    meta_path = tmp_path / "Rock_Albedo.tga.meta"
+    meta_path.write_bytes(TEXTURE_META)
+    assert read_meta(str(meta_path)) == ImportSettings(
+        max_size=1024, compression=0, srgb=1, mipmaps=1, readable=0, texture_type=0)
+
+
+def test_platform_entry_last(tmp_path):
+    # DefaultTexturePlatform as the last entry runs to the end of the file
+    data = TEXTURE_META.replace(b"buildTarget: Standalone", b"buildTarget: Android")
+    start = data.index(b"  - serializedVersion: 3\n    buildTarget: DefaultTexturePlatform")
+    end = data.index(b"  - serializedVersion: 3\n    buildTarget: Android")
+    reordered = data[:start] + data[end:data.index(b"  spriteSheet:")] + data[start:end]
+    assert parse_meta(reordered).max_size == 1024
+    assert parse_meta(reordered).compression == 0
+
+
+def test_top_level_without_platform_entry():
+    settings = parse_meta(legacy_meta(maxTextureSize=512, textureCompression=1, textureType=1))
+    assert (settings.max_size, settings.compression, settings.texture_type) == (512, 1, 1)
+    assert settings.srgb is None
+    # platformSettings listing other platforms only
+    data = TEXTURE_META.replace(b"buildTarget: DefaultTexturePlatform", b"buildTarget: iPhone")
+    assert parse_meta(data).max_size == 2048
+
+
+def test_sprite_max_texture_size_is_not_max_size():
+    data = legacy_meta(spriteMaxTextureSize=32, maxTextureSize=2048)
+    assert parse_meta(data).max_size == 2048
+    assert parse_meta(legacy_meta(spriteMaxTextureSize=32)).max_size is None
+
+
+def test_no_texture_importer():
+    folder_meta = b"fileFormatVersion: 2\nguid: 1234\nfolderAsset: yes\nDefaultImporter:\n  userData:\n"
+    assert parse_meta(folder_meta) is None
+    assert parse_meta(b"") is None
+    assert ImportSettingsChecker().check("Albedo", None, 1024) == ["No TextureImporter settings in .meta"]
+
+
+def test_malformed_value():
+    data = TEXTURE_META.replace(b"maxTextureSize: 1024", b"maxTextureSize: {fileID: 0}")
+    settings = parse_meta(data)
+    # The broken value is dropped, not replaced by the legacy top-level one
+    assert settings.max_size is None
+    assert (settings.compression, settings.srgb) == (0, 1)
+
+
+@pytest.mark.parametrize("map_type, expected", [
+    ("Albedo", ["Max size 1024 is below the texture size 2048", "Compression is off"]),
+    ("Normal", ["Max size 1024 is below the texture size 2048", "Compression is off",
+                "Not imported as a Normal map", "sRGB is on for a normal map"]),
+    ("Roughness", ["Max size 1024 is below the texture size 2048", "Compression is off",
+                   "sRGB is on for a linear data map"]),
+])
+def test_check(map_type, expected):
+    assert ImportSettingsChecker().check(map_type, parse_meta(TEXTURE_META), 2048) == expected
+
+
+def test_check_options():
+    settings = ImportSettings(max_size=4096, compression=0, srgb=0, mipmaps=0, readable=1, texture_type=1)
+    assert ImportSettingsChecker().check("Normal", settings, 2048) == [
+        "Compression is off", "Mipmaps are off", "Read/Write is enabled (keeps a CPU copy)"]
+    lenient = ImportSettingsChecker(require_mipmaps=False, allow_read_write=True, allow_uncompressed=True)
+    assert lenient.check("Normal", settings, 2048) == []
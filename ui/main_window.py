@@ -1,11 +1,17 @@
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QLabel, QLineEdit, QPushButton, QFileDialog, 
-                             QListWidget, QMessageBox, QCheckBox, QGroupBox, 
-                             QSpinBox, QFormLayout, QDialog, QInputDialog)
-from PyQt5.QtCore import Qt
-from modules.texture_validator import TextureValidator
+                             QListView, QMessageBox, QCheckBox, QGroupBox, 
+                             QSpinBox, QFormLayout, QDialog, QInputDialog, QProgressBar,
+                             QComboBox)
+from PyQt5.QtCore import Qt, QThread, QTimer, QSize
+from modules.texture_validator import TextureValidator, ISSUE_KINDS
 from modules.config_manager import ConfigManager
+from modules.archive_source import is_archive
+from modules.metrics import metrics_from_env, profiler_from_env
+from modules.naming_rules import NamingRules
+from ui.results_model import ResultsModel, SORT_SCAN, SORT_NAME, SORT_STATUS
 import os
+import time
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -13,8 +19,19 @@ class MainWindow(QMainWindow):
         self.setWindowTitle("Unity Texture Checker Tool")
         self.setGeometry(100, 100, 800, 600)
         
+        # The probe cache (SQLite) is opened on the first check, not at start-up
         self.validator = TextureValidator()
-        self.config_manager = ConfigManager(os.path.join("data", "settings.json"))
+        self.validation_thread = None
+        self.validation_worker = None
+        self.watching = False
+        # modules.vram_budget.VramTable while a check estimates GPU memory
+        self.vram_table = None
+        # Past runs (modules.result_store), opened on first use
+        self.result_store = None
+        # ui.thumbnails.ThumbnailCache, created when thumbnails are first shown
+        self.thumbnail_cache = None
+        # Settings are written behind the UI: coalesced, then flushed on close
+        self.config_manager = ConfigManager(os.path.join("data", "settings.json"), write_delay=1.0)
         
         self.init_ui()
         self.load_settings()
@@ -31,8 +48,11 @@ class MainWindow(QMainWindow):
         self.path_input = QLineEdit()
         browse_button = QPushButton("Browse")
         browse_button.clicked.connect(self.browse_folder)
+        archive_button = QPushButton("Archive...")
+        archive_button.clicked.connect(self.browse_archive)
         folder_layout.addWidget(self.path_input)
         folder_layout.addWidget(browse_button)
+        folder_layout.addWidget(archive_button)
         folder_group.setLayout(folder_layout)
         main_layout.addWidget(folder_group)
         
@@ -71,17 +91,98 @@ class MainWindow(QMainWindow):
         maps_layout.addLayout(self.map_layout)
         settings_layout.addRow(maps_layout)
         
+        # File formats
+        self.format_input = QLineEdit(".tga")
+        self.format_input.setToolTip("One or more extensions, comma-separated")
+        settings_layout.addRow("Formats:", self.format_input)
+        
+        # Pixel content checks
+        self.content_checks_checkbox = QCheckBox("Check pixel content (slower)")
+        settings_layout.addRow(self.content_checks_checkbox)
+        
+        # Unity import settings
+        self.import_settings_checkbox = QCheckBox("Check Unity import settings (.meta)")
+        settings_layout.addRow(self.import_settings_checkbox)
+        
+        # GPU memory estimate
+        self.vram_checkbox = QCheckBox("Estimate GPU memory")
+        settings_layout.addRow(self.vram_checkbox)
+        
         settings_group.setLayout(settings_layout)
         main_layout.addWidget(settings_group)
         
-        # Check button
-        check_button = QPushButton("Check Textures")
-        check_button.clicked.connect(self.check_textures)
-        main_layout.addWidget(check_button)
+        # Check / cancel buttons
+        buttons_layout = QHBoxLayout()
+        self.check_button = QPushButton("Check Textures")
+        self.check_button.clicked.connect(self.check_textures)
+        self.watch_checkbox = QCheckBox("Watch for changes")
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.cancel_check)
+        buttons_layout.addWidget(self.check_button)
+        buttons_layout.addWidget(self.watch_checkbox)
+        buttons_layout.addWidget(self.cancel_button)
+        history_button = QPushButton("History...")
+        history_button.clicked.connect(self.open_history)
+        compare_button = QPushButton("Compare...")
+        compare_button.clicked.connect(self.compare_runs)
+        buttons_layout.addWidget(history_button)
+        buttons_layout.addWidget(compare_button)
+        main_layout.addLayout(buttons_layout)
+        
+        # Progress
+        progress_layout = QHBoxLayout()
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 1)
+        self.progress_bar.setValue(0)
+        self.progress_label = QLabel("")
+        progress_layout.addWidget(self.progress_bar)
+        progress_layout.addWidget(self.progress_label)
+        main_layout.addLayout(progress_layout)
+        
+        # Result filters
+        filter_layout = QHBoxLayout()
+        self.invalid_only_checkbox = QCheckBox("Invalid only")
+        self.invalid_only_checkbox.toggled.connect(self.apply_result_filter)
+        self.map_filter_combo = QComboBox()
+        self.map_filter_combo.addItem("All maps", None)
+        self.map_filter_combo.currentIndexChanged.connect(self.apply_result_filter)
+        self.kind_filter_combo = QComboBox()
+        self.kind_filter_combo.addItem("All issues", None)
+        for kind in ISSUE_KINDS:
+            self.kind_filter_combo.addItem(kind.capitalize(), kind)
+        self.kind_filter_combo.currentIndexChanged.connect(self.apply_result_filter)
+        self.sort_combo = QComboBox()
+        self.sort_combo.addItem("Scan order", SORT_SCAN)
+        self.sort_combo.addItem("By name", SORT_NAME)
+        self.sort_combo.addItem("Invalid first", SORT_STATUS)
+        self.sort_combo.currentIndexChanged.connect(
+            lambda: self.results_model.set_sort(self.sort_combo.currentData())
+        )
+        filter_layout.addWidget(self.invalid_only_checkbox)
+        filter_layout.addWidget(self.map_filter_combo)
+        filter_layout.addWidget(self.kind_filter_combo)
+        self.thumbnails_checkbox = QCheckBox("Thumbnails")
+        self.thumbnails_checkbox.toggled.connect(self.toggle_thumbnails)
+        filter_layout.addWidget(self.sort_combo)
+        filter_layout.addWidget(self.thumbnails_checkbox)
+        filter_layout.addStretch()
+        main_layout.addLayout(filter_layout)
         
         # Results list
-        self.results_list = QListWidget()
+        self.results_model = ResultsModel(self)
+        self.results_list = QListView()
+        self.results_list.setUniformItemSizes(True)
+        self.results_list.setModel(self.results_model)
+        self.default_delegate = self.results_list.itemDelegate()
         main_layout.addWidget(self.results_list)
+        
+        # Thumbnails arrive one by one from worker threads; repaint the
+        # visible rows at most every 50 ms
+        self.thumbnail_timer = QTimer(self)
+        self.thumbnail_timer.setSingleShot(True)
+        self.thumbnail_timer.setInterval(50)
+        self.thumbnail_timer.timeout.connect(self.results_list.viewport().update)
     
     def add_custom_map(self):
         try:
@@ -100,12 +201,10 @@ class MainWindow(QMainWindow):
                 
                 # Update settings
                 try:
-                    settings = self.config_manager.load_settings()
-                    if "custom_maps" not in settings:
-                        settings["custom_maps"] = []
-                    if text not in settings["custom_maps"]:
-                        settings["custom_maps"].append(text)
-                    self.config_manager.update_settings(settings)
+                    custom_maps = list(self.config_manager.get_setting("custom_maps", []))
+                    if text not in custom_maps:
+                        custom_maps.append(text)
+                    self.config_manager.update_setting("custom_maps", custom_maps)
                 except Exception as e:
                     QMessageBox.warning(self, "Warning", f"Could not save custom map: {str(e)}")
         except Exception as e:
@@ -117,42 +216,261 @@ class MainWindow(QMainWindow):
             self.path_input.setText(folder_path)
             self.config_manager.update_setting("last_folder", folder_path)
     
+    def browse_archive(self):
+        archive_path, _ = QFileDialog.getOpenFileName(
+            self, "Select Texture Archive", "",
+            "Archives (*.zip *.unitypackage *.tar *.tar.gz *.tgz *.tar.bz2 *.tar.xz)"
+        )
+        if archive_path:
+            self.path_input.setText(archive_path)
+            self.config_manager.update_setting("last_folder", archive_path)
+    
     def check_textures(self):
         folder_path = self.path_input.text()
-        if not folder_path or not os.path.isdir(folder_path):
-            QMessageBox.critical(self, "Error", "Please select a valid folder path!")
+        if not folder_path or not (os.path.isdir(folder_path) or is_archive(folder_path)):
+            QMessageBox.critical(self, "Error", "Please select a valid folder path or archive!")
             return
         
         # Get settings from UI
         settings = {
             "required_resolution": self.resolution_spinbox.value(),
-            "required_format": ".tga",
-            "required_maps": [map_name for map_name, cb in self.map_checkboxes.items() if cb.isChecked()]
+            "required_format": self.format_input.text().strip() or ".tga",
+            "required_maps": [map_name for map_name, cb in self.map_checkboxes.items() if cb.isChecked()],
+            "content_checks": self.content_checks_checkbox.isChecked(),
+            "import_settings": self.import_settings_checkbox.isChecked(),
+            "vram_estimate": self.vram_checkbox.isChecked()
         }
         
+        # Aliases and per-map constraints come from "naming_rules" in settings.json
+        try:
+            self.validator.naming_rules = NamingRules.from_dict(self.config_manager.get_setting("naming_rules", {}))
+        except ValueError as e:
+            QMessageBox.warning(self, "Warning", f"Invalid naming rules in settings, using defaults: {str(e)}")
+            self.validator.naming_rules = NamingRules()
+        
+        self.validator.import_checker = None
+        if settings["import_settings"]:
+            from modules.unity_meta import ImportSettingsChecker
+            self.validator.import_checker = ImportSettingsChecker()
+        
+        self.validator.content_checker = None
+        if settings["content_checks"]:
+            try:
+                from modules.content_checks import ContentChecker
+                self.validator.content_checker = ContentChecker()
+            except ImportError:
+                QMessageBox.warning(self, "Warning", "Pixel content checks need NumPy (pip install numpy).")
+        
+        self.vram_table = None
+        if settings["vram_estimate"]:
+            try:
+                from modules.vram_budget import VramTable
+                self.vram_table = VramTable()
+            except ImportError:
+                QMessageBox.warning(self, "Warning", "GPU memory estimates need NumPy (pip install numpy).")
+        self.validator.record_textures = self.vram_table is not None
+        
         # Save settings
         self.config_manager.update_settings(settings)
         
-        # Check textures
-        results = self.validator.validate_folder(
-            folder_path,
-            settings["required_maps"],
-            settings["required_resolution"],
-            settings["required_format"]
-        )
+        if self.validator.probe_cache is None:
+            from modules.probe_cache import ProbeCache
+            self.validator.probe_cache = ProbeCache(os.path.join("data", "probe_cache.db"))
+        
+        self.validator.metrics = metrics_from_env(os.path.basename(os.path.normpath(folder_path)))
         
-        # Display results
-        self.display_results(results)
+        if self.thumbnail_cache is not None:
+            # Textures may have changed since they were last shown
+            self.thumbnail_cache.clear_memory()
+        
+        # Check textures in a worker thread, results are streamed back in batches
+        from ui.validation_worker import ValidationWorker
+        self.results_model.clear()
+        self.total_files = 0
+        self.progress_bar.setRange(0, 0)
+        self.progress_label.setText("Scanning...")
+        self.check_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
+        
+        self.validation_thread = QThread(self)
+        self.validation_worker = ValidationWorker(
+            self.validator, folder_path, settings,
+            workers=min(8, os.cpu_count() or 1),
+            watch=self.watch_checkbox.isChecked(),
+            profiler=profiler_from_env(),
+            result_store=self.get_result_store()
+        )
+        self.validation_worker.moveToThread(self.validation_thread)
+        self.validation_thread.started.connect(self.validation_worker.run)
+        self.validation_worker.total_found.connect(self.set_total_files)
+        self.validation_worker.results_ready.connect(self.append_results)
+        self.validation_worker.progress.connect(self.update_progress)
+        self.validation_worker.failed.connect(self.validation_failed)
+        self.validation_worker.watching.connect(self.validation_watching)
+        self.validation_worker.finished.connect(self.validation_finished)
+        self.validation_worker.finished.connect(self.validation_thread.quit)
+        self.validation_thread.finished.connect(self.validation_worker.deleteLater)
+        self.validation_thread.finished.connect(self.validation_thread.deleteLater)
+        self.validation_start = time.monotonic()
+        self.validation_thread.start()
+    
+    def cancel_check(self):
+        if self.validation_worker is not None:
+            self.validation_worker.cancel()
+            self.cancel_button.setEnabled(False)
+            self.progress_label.setText("Cancelling...")
+    
+    def set_total_files(self, total):
+        self.total_files = total
+        self.progress_bar.setRange(0, max(total, 1))
+    
+    def update_progress(self, files_done, sets_done):
+        if self.watching:
+            # Counters after the initial pass aren't meaningful against the total
+            return
+        elapsed = max(time.monotonic() - self.validation_start, 1e-6)
+        rate = files_done / elapsed
+        text = f"{files_done} files, {sets_done} sets, {rate:.0f} files/s"
+        if self.total_files:
+            self.progress_bar.setValue(min(files_done, self.total_files))
+            if rate > 0:
+                eta = (self.total_files - files_done) / rate
+                text += f", ETA {eta:.0f}s"
+        self.progress_label.setText(text)
+    
+    def validation_failed(self, message):
+        QMessageBox.critical(self, "Error", f"Validation failed: {message}")
+    
+    def validation_watching(self):
+        self.progress_bar.setRange(0, 1)
+        self.progress_bar.setValue(1)
+        elapsed = time.monotonic() - self.validation_start
+        self.progress_label.setText(f"Done in {elapsed:.1f}s{self.vram_summary()}, watching for changes...")
+        self.watching = True
+        self.cancel_button.setText("Stop Watching")
+    
+    def validation_finished(self, cancelled):
+        was_watching = self.watching
+        self.watching = False
+        self.cancel_button.setText("Cancel")
+        self.check_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+        self.progress_bar.setRange(0, 1)
+        self.progress_bar.setValue(0 if cancelled else 1)
+        elapsed = time.monotonic() - self.validation_start
+        if was_watching:
+            self.progress_label.setText("Stopped watching")
+        else:
+            status = "Cancelled" if cancelled else "Done"
+            self.progress_label.setText(f"{status} in {elapsed:.1f}s{self.vram_summary()}")
+        self.validation_worker = None
+        try:
+            self.validator.metrics.export()
+        except OSError as e:
+            QMessageBox.warning(self, "Warning", f"Could not write metrics: {str(e)}")
+    
+    def toggle_thumbnails(self, enabled):
+        if enabled and self.thumbnail_cache is None:
+            from ui.thumbnails import ThumbnailCache, ThumbnailDelegate
+            self.thumbnail_cache = ThumbnailCache(os.path.join("data", "thumbnails"), parent=self)
+            self.thumbnail_cache.ready.connect(self.schedule_thumbnail_repaint)
+            self.thumbnail_delegate = ThumbnailDelegate(self.thumbnail_cache.size, self.results_list)
+        if enabled:
+            size = self.thumbnail_cache.size
+            self.results_list.setIconSize(QSize(size, size))
+            self.results_list.setItemDelegate(self.thumbnail_delegate)
+        else:
+            self.results_list.setItemDelegate(self.default_delegate)
+        self.results_model.thumbnails = self.thumbnail_cache if enabled else None
+        self.results_list.doItemsLayout()
+        self.config_manager.update_settings({"thumbnails": enabled})
+    
+    def schedule_thumbnail_repaint(self):
+        if not self.thumbnail_timer.isActive():
+            self.thumbnail_timer.start()
+    
+    def get_result_store(self):
+        if self.result_store is None:
+            from modules.result_store import ResultStore
+            self.result_store = ResultStore(os.path.join("data", "results.db"))
+        return self.result_store
+    
+    def pick_run(self, title, label):
+        runs = self.get_result_store().runs()
+        if not runs:
+            QMessageBox.information(self, "History", "No saved runs yet.")
+            return None
+        labels = []
+        for run in runs:
+            started = time.strftime("%Y-%m-%d %H:%M", time.localtime(run["started"]))
+            text = f"#{run['id']}  {started}  {run['source']}  ({run['invalid']}/{run['sets']} invalid)"
+            if not run["complete"]:
+                text += "  [incomplete]"
+            labels.append(text)
+        choice, ok = QInputDialog.getItem(self, title, label, labels, 0, False)
+        if not ok:
+            return None
+        return runs[labels.index(choice)]
+    
+    def open_history(self):
+        if self.validation_worker is not None:
+            return
+        run = self.pick_run("History", "Show the results of:")
+        if run is None:
+            return
+        # Shown straight from the store, nothing is validated again
+        self.vram_table = None
+        self.results_model.clear()
+        self.append_results(list(self.result_store.iter_results(run["id"])))
+        started = time.strftime("%Y-%m-%d %H:%M", time.localtime(run["started"]))
+        self.progress_label.setText(f"Run #{run['id']} from {started}")
+    
+    def compare_runs(self):
+        old_run = self.pick_run("Compare", "Compare this run:")
+        if old_run is None:
+            return
+        new_run = self.pick_run("Compare", f"Compare run #{old_run['id']} with:")
+        if new_run is None:
+            return
+        changes = self.result_store.diff(old_run["id"], new_run["id"])
+        summary = (f"From run #{old_run['id']} to #{new_run['id']}: "
+                   f"{len(changes['broken'])} newly broken, {len(changes['fixed'])} fixed, "
+                   f"{len(changes['added'])} added, {len(changes['removed'])} removed")
+        if self.result_store.is_partial(old_run["id"]) or self.result_store.is_partial(new_run["id"]):
+            summary += "\n\nOnly the sets re-checked by the partial (--changed-since/--staged) run are compared."
+        lines = []
+        for change in ("broken", "fixed", "added", "removed"):
+            lines.extend(f"{change}: {os.path.join(folder, name)}" for folder, name in changes[change])
+        box = QMessageBox(QMessageBox.Information, "Compare", summary, QMessageBox.Ok, self)
+        if lines:
+            box.setDetailedText("\n".join(lines))
+        box.exec_()
+    
+    def vram_summary(self):
+        if self.vram_table is None:
+            return ""
+        total = self.vram_table.rollup()["project"]
+        return f", estimated GPU memory {total / (1024 * 1024):.1f} MB"
     
     def display_results(self, results):
-        self.results_list.clear()
-        for result in results:
-            if result["status"] == "valid":
-                self.results_list.addItem(f"✅ {result['texture_set']}: All requirements met")
-            else:
-                self.results_list.addItem(f"❌ {result['texture_set']}: {result['message']}")
-                for detail in result.get("details", []):
-                    self.results_list.addItem(f"  ⚠ {detail}")
+        self.results_model.clear()
+        self.append_results(results)
+    
+    def append_results(self, results):
+        with self.validator.metrics.stage("render"):
+            self.results_model.append_results(results)
+        if self.vram_table is not None:
+            self.vram_table.add_results(results)
+        # Offer any map types seen for the first time as filter choices
+        for map_type in self.results_model.map_types[self.map_filter_combo.count() - 1:]:
+            self.map_filter_combo.addItem(map_type, map_type)
+    
+    def apply_result_filter(self):
+        self.results_model.set_filter(
+            invalid_only=self.invalid_only_checkbox.isChecked(),
+            map_type=self.map_filter_combo.currentData(),
+            error_kind=self.kind_filter_combo.currentData()
+        )
     
     def load_settings(self):
         try:
@@ -164,6 +482,18 @@ class MainWindow(QMainWindow):
                 except Exception as e:
                     print(f"Error setting resolution: {str(e)}")
                 
+                # Set formats
+                required_format = settings.get("required_format", ".tga")
+                if not isinstance(required_format, str):
+                    required_format = ", ".join(required_format)
+                self.format_input.setText(required_format)
+                
+                # Set content checks
+                self.content_checks_checkbox.setChecked(settings.get("content_checks", False))
+                self.import_settings_checkbox.setChecked(settings.get("import_settings", False))
+                self.vram_checkbox.setChecked(settings.get("vram_estimate", False))
+                self.thumbnails_checkbox.setChecked(settings.get("thumbnails", False))
+                
                 # Set last folder
                 try:
                     if "last_folder" in settings:
@@ -193,8 +523,16 @@ class MainWindow(QMainWindow):
             print(f"Error loading settings: {str(e)}")
     
     def closeEvent(self, event):
+        if self.validation_worker is not None:
+            self.validation_worker.cancel()
+            self.validation_thread.quit()
+            self.validation_thread.wait()
         try:
-            self.config_manager.save_settings()
+            self.config_manager.flush()
         except Exception as e:
             print(f"Error saving settings: {str(e)}")
+        if self.result_store is not None:
+            self.result_store.close()
+        if self.thumbnail_cache is not None:
+            self.thumbnail_cache.close()
         super().closeEvent(event)
\ No newline at end of file
@@ -0,0 +1,225 @@
+from array import array
+
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, Qt
+
+ROW_SET = 0
+ROW_ISSUE = 1
+
+STATUS_VALID = 0
+STATUS_INVALID = 1
+
+SORT_SCAN = "scan"
+SORT_NAME = "name"
+SORT_STATUS = "status"
+
+
+class ResultsModel(QAbstractListModel):
+    # Rows live in parallel arrays (one entry per row) instead of one widget
+    # or object per row. Text is only built when the view asks for a visible
+    # row, and filtering/sorting just rebuild the `_visible` index.
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.map_types = []
+        self.error_kinds = []
+        self._map_ids = {}
+        self._kind_ids = {}
+        self._reset_store()
+        self._invalid_only = False
+        self._map_filter = -1
+        self._kind_filter = -1
+        self._sort = SORT_SCAN
+        # Optional ui.thumbnails.ThumbnailCache for issue rows with a path
+        self.thumbnails = None
+
+    def _reset_store(self):
+        self._row_kinds = array("b")
+        self._statuses = array("b")
+        self._parents = array("i")      # set row for each row (itself for set rows)
+        self._map_col = array("h")      # index into map_types, -1 for set rows
+        self._kind_col = array("h")     # index into error_kinds, -1 for set rows
+        self._names = []                # set name for set rows, None for issue rows
+        self._messages = []
+        self._paths = []                # texture path for issue rows, None otherwise
+        self._set_rows = array("i")
+        self._rows_by_key = {}          # (folder, set name) -> set row
+        self._dead = bytearray()        # rows replaced by a newer result (watch mode)
+        self._dead_count = 0
+        self._visible = None            # None means every row, in scan order
+
+    # Store
+
+    def clear(self):
+        self.beginResetModel()
+        self._reset_store()
+        if self._has_filter() or self._sort != SORT_SCAN:
+            # Filters and sort stay in effect: keep an (empty) index so
+            # appended results go through them
+            self._visible = array("i")
+        self.endResetModel()
+
+    def append_results(self, results):
+        # A result for a set that is already listed replaces its rows
+        first_new = len(self._row_kinds)
+        dead_before = self._dead_count
+        for result in results:
+            self._append_result(result)
+        if self._dead_count != dead_before:
+            self._refresh_view()
+        elif len(self._row_kinds) == first_new:
+            return
+        elif self._visible is None:
+            self.beginInsertRows(QModelIndex(), first_new, len(self._row_kinds) - 1)
+            self.endInsertRows()
+        elif self._sort == SORT_SCAN:
+            # Filtered view: only the new rows need checking
+            new_rows = self._filter_rows(range(first_new, len(self._row_kinds)))
+            if new_rows:
+                start = len(self._visible)
+                self.beginInsertRows(QModelIndex(), start, start + len(new_rows) - 1)
+                self._visible.extend(new_rows)
+                self.endInsertRows()
+        else:
+            self._refresh_view()
+
+    def _append_result(self, result):
+        key = (result.get("folder", ""), result["texture_set"])
+        old_row = self._rows_by_key.pop(key, None)
+        if old_row is not None:
+            self._kill_set(old_row)
+        if result["status"] == "removed":
+            return
+        set_row = len(self._row_kinds)
+        self._rows_by_key[key] = set_row
+        status = STATUS_VALID if result["status"] == "valid" else STATUS_INVALID
+        self._row_kinds.append(ROW_SET)
+        self._statuses.append(status)
+        self._parents.append(set_row)
+        self._map_col.append(-1)
+        self._kind_col.append(-1)
+        self._names.append(result["texture_set"])
+        self._messages.append(result["message"])
+        self._paths.append(None)
+        self._set_rows.append(set_row)
+        self._dead.append(0)
+        for issue in result.get("issues", []):
+            self._dead.append(0)
+            self._row_kinds.append(ROW_ISSUE)
+            self._statuses.append(status)
+            self._parents.append(set_row)
+            self._map_col.append(self._intern(issue["map"], self._map_ids, self.map_types))
+            self._kind_col.append(self._intern(issue["kind"], self._kind_ids, self.error_kinds))
+            self._names.append(None)
+            self._messages.append(issue["message"])
+            self._paths.append(issue.get("path"))
+
+    def _kill_set(self, set_row):
+        row = set_row
+        while True:
+            self._dead[row] = 1
+            self._dead_count += 1
+            row += 1
+            if row >= len(self._row_kinds) or self._row_kinds[row] != ROW_ISSUE:
+                break
+    
+    def _intern(self, value, ids, values):
+        index = ids.get(value)
+        if index is None:
+            index = ids[value] = len(values)
+            values.append(value)
+        return index
+
+    # Qt model interface
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        if self._visible is None:
+            return len(self._row_kinds)
+        return len(self._visible)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row() if self._visible is None else self._visible[index.row()]
+        if role == Qt.DisplayRole:
+            return self._row_text(row)
+        if role == Qt.ToolTipRole and self._row_kinds[row] == ROW_ISSUE:
+            return self._names[self._parents[row]]
+        if role == Qt.DecorationRole and self.thumbnails is not None and self._paths[row]:
+            return self.thumbnails.get(self._paths[row])
+        return None
+
+    def _row_text(self, row):
+        if self._row_kinds[row] == ROW_ISSUE:
+            return f"  ⚠ {self._messages[row]}"
+        if self._statuses[row] == STATUS_VALID:
+            return f"✅ {self._names[row]}: {self._messages[row]}"
+        return f"❌ {self._names[row]}: {self._messages[row]}"
+
+    # Filtering and sorting
+
+    def set_filter(self, invalid_only=False, map_type=None, error_kind=None):
+        self._invalid_only = invalid_only
+        self._map_filter = self._map_ids.get(map_type, -2) if map_type else -1
+        self._kind_filter = self._kind_ids.get(error_kind, -2) if error_kind else -1
+        self._refresh_view()
+
+    def set_sort(self, sort):
+        self._sort = sort
+        self._refresh_view()
+
+    def _has_filter(self):
+        return self._invalid_only or self._map_filter != -1 or self._kind_filter != -1
+
+    def _refresh_view(self):
+        self.beginResetModel()
+        if not self._has_filter() and self._sort == SORT_SCAN and not self._dead_count:
+            self._visible = None
+        else:
+            self._visible = self._filter_rows(self._ordered_rows())
+        self.endResetModel()
+
+    def _ordered_rows(self):
+        if self._sort == SORT_SCAN:
+            return range(len(self._row_kinds))
+        set_rows = list(self._set_rows)
+        if self._sort == SORT_NAME:
+            set_rows.sort(key=lambda row: self._names[row].lower())
+        else:
+            # Invalid first, then by name
+            set_rows.sort(key=lambda row: (-self._statuses[row], self._names[row].lower()))
+        ordered = array("i")
+        for set_row in set_rows:
+            end = set_row + 1
+            while end < len(self._row_kinds) and self._row_kinds[end] == ROW_ISSUE:
+                end += 1
+            ordered.extend(range(set_row, end))
+        return ordered
+
+    def _filter_rows(self, rows):
+        by_issue = self._map_filter != -1 or self._kind_filter != -1
+        visible = array("i")
+        pending_set = -1
+        for row in rows:
+            if self._dead[row]:
+                continue
+            if self._invalid_only and self._statuses[row] != STATUS_INVALID:
+                continue
+            if self._row_kinds[row] == ROW_SET:
+                if by_issue:
+                    # Only shown if one of its issues matches
+                    pending_set = row
+                else:
+                    visible.append(row)
+                continue
+            if by_issue:
+                if self._map_filter != -1 and self._map_col[row] != self._map_filter:
+                    continue
+                if self._kind_filter != -1 and self._kind_col[row] != self._kind_filter:
+                    continue
+                if pending_set == self._parents[row]:
+                    visible.append(pending_set)
+                    pending_set = -1
+            visible.append(row)
+        return visible
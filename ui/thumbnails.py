@@ -0,0 +1,184 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict, deque
+
+from PyQt5.QtCore import QObject, QSize, pyqtSignal
+from PyQt5.QtGui import QImage
+from PyQt5.QtWidgets import QStyledItemDelegate
+
+# Thumbnails for the results list. Images are only decoded when a row with a
+# texture path is painted: background threads shrink them with Pillow's
+# draft()/reduce() so nothing is resampled at full resolution, and keep the
+# result as a PNG keyed by path, size and mtime. Decoded QImages live in an
+# LRU bounded by bytes. Requests are served newest first and the queue is
+# capped, so rows scrolled past quickly are dropped rather than decoded.
+
+THUMBNAIL_SIZE = 48
+
+
+class ThumbnailCache(QObject):
+    # Emitted from worker threads when thumbnails are ready; the connection
+    # is queued to the GUI thread
+    ready = pyqtSignal()
+
+    def __init__(self, cache_dir, size=THUMBNAIL_SIZE, max_memory_bytes=32 * 1024 * 1024,
+                 max_disk_bytes=256 * 1024 * 1024, workers=2, max_queue=256, parent=None):
+        super().__init__(parent)
+        self.cache_dir = cache_dir
+        self.size = size
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.max_queue = max_queue
+        self._memory = OrderedDict()    # path -> QImage
+        self._memory_bytes = 0
+        self._failed = set()
+        self._queue = deque()
+        self._queued = set()
+        self._closed = False
+        self._condition = threading.Condition()
+        self._threads = []
+        for _ in range(workers):
+            thread = threading.Thread(target=self._work, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def get(self, path):
+        """Return the thumbnail of `path` as a QImage, or None and load it in the background."""
+        with self._condition:
+            image = self._memory.get(path)
+            if image is not None:
+                self._memory.move_to_end(path)
+                return image
+            if path in self._failed:
+                return None
+            if path in self._queued:
+                # Asked for again: move it to the front
+                self._queue.remove(path)
+            else:
+                self._queued.add(path)
+                if len(self._queue) >= self.max_queue:
+                    self._queued.discard(self._queue.popleft())
+            self._queue.append(path)
+            self._condition.notify()
+        return None
+
+    def clear_memory(self):
+        # Files may have changed since; the disk cache still knows their mtimes
+        with self._condition:
+            self._memory.clear()
+            self._memory_bytes = 0
+            self._failed.clear()
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._queue.clear()
+            self._queued.clear()
+            self._condition.notify_all()
+        self._prune_disk()
+
+    def _work(self):
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                path = self._queue.pop()
+            image = self._load(path)
+            with self._condition:
+                self._queued.discard(path)
+                if image is None:
+                    self._failed.add(path)
+                else:
+                    self._remember(path, image)
+            if image is not None:
+                self.ready.emit()
+
+    def _remember(self, path, image):
+        self._memory[path] = image
+        self._memory_bytes += image.sizeInBytes()
+        while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted.sizeInBytes()
+
+    def _load(self, path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        key = hashlib.sha1(f"{path}\0{stat.st_size}\0{stat.st_mtime_ns}\0{self.size}".encode()).hexdigest()
+        cached_path = os.path.join(self.cache_dir, key[:2], key + ".png")
+        image = QImage(cached_path)
+        if not image.isNull():
+            try:
+                # Recently used thumbnails survive pruning
+                os.utime(cached_path)
+            except OSError:
+                pass
+            return image
+        try:
+            thumbnail = self._decode(path)
+            os.makedirs(os.path.dirname(cached_path), exist_ok=True)
+            temp_path = f"{cached_path}.{threading.get_ident()}.tmp"
+            thumbnail.save(temp_path, "PNG")
+            os.replace(temp_path, cached_path)
+        except Exception:
+            return None
+        data = thumbnail.tobytes()
+        return QImage(data, thumbnail.width, thumbnail.height, thumbnail.width * 4, QImage.Format_RGBA8888).copy()
+
+    def _decode(self, path):
+        from PIL import Image
+        with Image.open(path) as img:
+            # JPEG decodes at 1/2..1/8 scale; other formats ignore this
+            img.draft("RGB", (self.size, self.size))
+            if img.mode.startswith("I"):
+                # 16-bit maps: keep the top 8 bits instead of clipping
+                img = img.convert("I").point(lambda value: value / 256).convert("L")
+            elif img.mode not in ("L", "LA", "RGB", "RGBA"):
+                img = img.convert("RGBA")
+            factor = min(img.width, img.height) // self.size
+            if factor > 1:
+                # Box-averages factor x factor blocks in one pass
+                img = img.reduce(factor)
+            img.thumbnail((self.size, self.size))
+            return img.convert("RGBA")
+
+    def _prune_disk(self):
+        # Oldest thumbnails go first once the cache is over its size
+        entries = []
+        total = 0
+        try:
+            for directory in os.scandir(self.cache_dir):
+                if directory.is_dir():
+                    for entry in os.scandir(directory.path):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+                        total += stat.st_size
+        except OSError:
+            return
+        if total <= self.max_disk_bytes:
+            return
+        entries.sort()
+        for _, file_size, path in entries:
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= file_size
+            if total <= self.max_disk_bytes:
+                break
+
+
+class ThumbnailDelegate(QStyledItemDelegate):
+    # Every row gets the thumbnail's height, so rows stay uniform whether
+    # their thumbnail is shown, still loading or absent
+    def __init__(self, size=THUMBNAIL_SIZE, parent=None):
+        super().__init__(parent)
+        self.size = size
+
+    def sizeHint(self, option, index):
+        hint = super().sizeHint(option, index)
+        return QSize(hint.width(), max(hint.height(), self.size + 4))
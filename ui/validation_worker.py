@@ -0,0 +1,128 @@
+import os
+import threading
+import time
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from modules.archive_source import is_archive
+
+BATCH_INTERVAL = 0.1    # seconds between result batches sent to the UI
+BATCH_SIZE = 500
+
+
+class ValidationWorker(QObject):
+    total_found = pyqtSignal(int)
+    results_ready = pyqtSignal(list)
+    progress = pyqtSignal(int, int)     # files checked, sets checked
+    watching = pyqtSignal()             # watch mode: initial pass done
+    finished = pyqtSignal(bool)         # True when cancelled
+    failed = pyqtSignal(str)
+
+    def __init__(self, validator, folder_path, settings, workers=1, executor="thread", watch=False,
+                 profiler=None, result_store=None):
+        super().__init__()
+        self.validator = validator
+        self.folder_path = folder_path
+        self.settings = settings
+        self.workers = workers
+        self.executor = executor
+        self.watch = watch
+        # Optional modules.metrics.Profiler; profiles this thread only
+        self.profiler = profiler
+        # Optional modules.result_store.ResultStore the run is recorded in
+        self.result_store = result_store
+        self._stop = threading.Event()
+        self._batch = []
+        self._batch_interval = BATCH_INTERVAL
+
+    @property
+    def _cancelled(self):
+        return self._stop.is_set()
+
+    def cancel(self):
+        # Called from the GUI thread; run() checks the flag between results
+        self._stop.set()
+
+    def run(self):
+        # Count files on the side so the progress bar gets a total without
+        # holding up validation
+        counter = threading.Thread(target=self._count_files, daemon=True)
+        counter.start()
+
+        args = (
+            self.folder_path,
+            self.settings["required_maps"],
+            self.settings["required_resolution"],
+            self.settings["required_format"]
+        )
+        if is_archive(self.folder_path):
+            results = self.validator.iter_validate_archive(*args)
+        elif self.watch:
+            results = self.validator.watch(*args, workers=self.workers, executor=self.executor,
+                                           stop_event=self._stop, on_ready=self._watching)
+        else:
+            # Maps kept in per-type folders (Albedo/, Normal/) still make one set
+            results = self.validator.iter_validate(*args, workers=self.workers, executor=self.executor,
+                                                   group_by_folder=False)
+        files_done = 0
+        sets_done = 0
+        last_emit = time.monotonic()
+        run_id = None
+        complete = False
+        if self.profiler is not None:
+            self.profiler.start()
+        try:
+            if self.result_store is not None:
+                run_id = self.result_store.begin_run(os.path.abspath(self.folder_path), self.settings)
+            for result in results:
+                if self._cancelled:
+                    break
+                if run_id is not None:
+                    self.result_store.add_result(run_id, result)
+                self._batch.append(result)
+                files_done += result.get("file_count", 0)
+                sets_done += 1
+                now = time.monotonic()
+                if len(self._batch) >= BATCH_SIZE or now - last_emit >= self._batch_interval:
+                    self._flush_batch()
+                    self.progress.emit(files_done, sets_done)
+                    last_emit = now
+            # Stopping watch mode leaves a full picture of the folder
+            complete = self.watch or not self._cancelled
+        except Exception as e:
+            self.failed.emit(str(e))
+        finally:
+            results.close()
+            if self.profiler is not None:
+                self.profiler.stop()
+            if run_id is not None:
+                try:
+                    self.result_store.end_run(run_id, complete)
+                except Exception as e:
+                    self.failed.emit(f"Could not save results - {str(e)}")
+        self._flush_batch()
+        self.progress.emit(files_done, sets_done)
+        self.finished.emit(self._cancelled)
+
+    def _flush_batch(self):
+        if self._batch:
+            self.results_ready.emit(self._batch)
+            self._batch = []
+
+    def _watching(self):
+        # Initial pass done: from now on changes arrive in small bursts, so
+        # send each result straight away
+        self._flush_batch()
+        self._batch_interval = 0
+        self.watching.emit()
+
+    def _count_files(self):
+        if is_archive(self.folder_path):
+            # Counting members would mean reading the archive twice
+            return
+        try:
+            total = self.validator.count_texture_files(self.folder_path, self.settings["required_format"])
+        except Exception:
+            return
+        if not self._cancelled:
+            self.total_found.emit(total)